@@ -2,14 +2,19 @@
 API clients for external services.
 """
 
+from .http_client import get_async_client, get_session
 from .apify_client import apify_service
 from .openai_client import openai_service
-from .perplexity_api import perplexity_search
+from .perplexity_api import perplexity_search, perplexity_search_async, perplexity_search_batch
 from .gemini_client import gemini_process_video
 
 __all__ = [
+    'get_session',
+    'get_async_client',
     'apify_service',
     'openai_service',
     'perplexity_search',
+    'perplexity_search_async',
+    'perplexity_search_batch',
     'gemini_process_video'
 ]
@@ -1,62 +1,422 @@
+import copy
+import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from apify_client import ApifyClient
-from src.config.settings import APIFY_API_TOKEN, DEFAULT_MAX_RESULTS
+from src.config.settings import (
+    APIFY_API_TOKEN, DEFAULT_MAX_RESULTS, APIFY_RUN_TIMEOUT, APIFY_POLL_MAX_DELAY, APIFY_PAGE_SIZE,
+    APIFY_CACHE_TTL_YOUTUBE, APIFY_CACHE_TTL_INSTAGRAM, APIFY_CACHE_MAX_ENTRIES
+)
+from src.utils.single_flight import SingleFlightCache, Uncached
 
 logger = logging.getLogger(__name__)
 
+YOUTUBE_ACTOR_ID = "h7sDV53CddomktSi5"
+INSTAGRAM_ACTOR_ID = "shu8hvrXbJbY3Eb9W"
+
+# Dataset fields the app reads, including the tags used to split multi-input runs
+YOUTUBE_FIELDS = ["id", "title", "channelName", "viewCount", "duration", "date", "url", "input", "searchQuery"]
+INSTAGRAM_FIELDS = [
+    "id", "caption", "likesCount", "commentsCount", "timestamp", "videoUrl", "url", "ownerUsername", "inputUrl"
+]
+
+# Run statuses after which a run no longer changes
+TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+
+# Run status polling backoff, in seconds
+POLL_INITIAL_DELAY = 0.5
+POLL_BACKOFF = 1.5
+
+# Seconds search results stay cached, per actor
+CACHE_TTLS = {
+    YOUTUBE_ACTOR_ID: APIFY_CACHE_TTL_YOUTUBE,
+    INSTAGRAM_ACTOR_ID: APIFY_CACHE_TTL_INSTAGRAM,
+}
+
+def _cache_key(actor_id, run_input):
+    """Cache key for an actor run, the same for equal inputs regardless of key order."""
+    return f"{actor_id}:{json.dumps(run_input, sort_keys=True)}"
+
+def _youtube_input(queries, max_results):
+    return {
+        "searchQueries": list(queries),
+        "maxResults": max_results,
+        "videoType": "video",
+        "sortingOrder": "relevance",
+        "dateFilter": "month"
+    }
+
+def _normalize_query(query):
+    return " ".join(str(query).split()).casefold()
+
+def _split_by_query(items, queries):
+    """
+    Group the items of a multi-query run by the query that produced them.
+
+    The actor tags each item with its search term in `input` (or
+    `searchQuery`). Items without a recognizable tag go to the only query
+    of a single-query run, and under `None` otherwise.
+
+    Returns:
+        dict: Items keyed by query, in query order
+    """
+    by_query = {query: [] for query in queries}
+    lookup = {_normalize_query(query): query for query in queries}
+    unmatched = []
+    for item in items:
+        tag = item.get('input') or item.get('searchQuery')
+        query = lookup.get(_normalize_query(tag)) if tag else None
+        if query is not None:
+            by_query[query].append(item)
+        elif len(queries) == 1:
+            by_query[queries[0]].append(item)
+        else:
+            unmatched.append(item)
+
+    if unmatched:
+        logger.warning(f"{len(unmatched)} YouTube results could not be matched to a query")
+        by_query[None] = unmatched
+    return by_query
+
+def _normalize_username(username):
+    return str(username).strip().lstrip('@').casefold()
+
+def _instagram_input(usernames, max_results):
+    return {
+        "directUrls": [f"https://www.instagram.com/{_normalize_username(username)}" for username in usernames],
+        "resultsType": "stories",
+        "resultsLimit": max_results
+    }
+
+def _group_by_owner(items, usernames, max_results):
+    """
+    Group the items of a multi-account run by account, keeping at most `max_results` per account.
+
+    Items are matched on `ownerUsername`, falling back to the profile URL in
+    `inputUrl`, ignoring case and a leading "@" in the given usernames. Unmatched items go to the only account of a single-account
+    run and are dropped otherwise.
+
+    Returns:
+        dict: Items keyed by username, in username order
+    """
+    by_username = {username: [] for username in usernames}
+    lookup = {_normalize_username(username): username for username in usernames}
+    unmatched = 0
+    for item in items:
+        owner = item.get('ownerUsername') or (item.get('inputUrl') or '').rstrip('/').rsplit('/', 1)[-1]
+        username = lookup.get(_normalize_username(owner)) if owner else None
+        if username is None and len(usernames) == 1:
+            username = usernames[0]
+        if username is None:
+            unmatched += 1
+            continue
+        if len(by_username[username]) < max_results:
+            by_username[username].append(item)
+            if all(len(posts) >= max_results for posts in by_username.values()):
+                # Every account is full, so stop reading further pages
+                break
+
+    if unmatched:
+        logger.warning(f"Dropped {unmatched} Instagram posts that could not be matched to an account")
+    return by_username
+
+def _ensure_urls(items):
+    """Ensure all YouTube items have a URL, passing items through as they arrive."""
+    for item in items:
+        if 'url' not in item:
+            video_id = item.get('id', '')
+            item['url'] = f"https://www.youtube.com/watch?v={video_id}"
+        yield item
+
 class ApifyService:
     def __init__(self):
         self.client = ApifyClient(APIFY_API_TOKEN)
+        # Search results by normalized single-query/account actor input, shared across sessions
+        self.cache = SingleFlightCache(max_entries=APIFY_CACHE_MAX_ENTRIES)
         
-    def search_youtube_podcasts(self, query, max_results=DEFAULT_MAX_RESULTS):
+    def start_run(self, actor_id, run_input, timeout=APIFY_RUN_TIMEOUT):
         """
-        Search for YouTube podcasts with enhanced error handling.
+        Start an actor run without waiting for it to finish.
+        
+        Args:
+            actor_id (str): Actor to run
+            run_input (dict): Actor input
+            timeout (int): Seconds after which Apify stops the run on its side too
+            
+        Returns:
+            dict: The started run
         """
-        actor_input = {
-            "searchQueries": [query],
-            "maxResults": max_results,
-            "videoType": "video",
-            "sortingOrder": "relevance",
-            "dateFilter": "month"
-        }
+        return self.client.actor(actor_id).start(run_input=run_input, timeout_secs=int(timeout))
+
+    def abort_run(self, run):
+        """
+        Abort a run, e.g. when its results are no longer needed.
         
+        Returns:
+            dict: The run as returned by the abort call, or the given run if that failed
+        """
         try:
-            run = self.client.actor("h7sDV53CddomktSi5").call(run_input=actor_input)
-            items = self.client.dataset(run["defaultDatasetId"]).list_items().items
+            return self.client.run(run["id"]).abort() or run
+        except Exception as e:
+            logger.warning(f"Failed to abort Apify run {run.get('id')}: {str(e)}")
+            return run
+
+    def as_completed(self, runs, timeout=APIFY_RUN_TIMEOUT, timeouts=None, cancel_event=None):
+        """
+        Poll started runs and yield each one as soon as it finishes.
+        
+        Runs that are still going past their deadline, or when `cancel_event`
+        is set, are aborted and yielded with their non-successful status, so
+        a stuck actor can never block the caller indefinitely.
+        
+        Args:
+            runs (dict): Started runs keyed by any caller-chosen key
+            timeout (float): Seconds each run may take
+            timeouts (dict): Per-key overrides of `timeout`
+            cancel_event (threading.Event): Aborts all unfinished runs when set
             
-            # Ensure all items have a URL
-            for item in items:
-                if 'url' not in item:
-                    video_id = item.get('id', '')
-                    item['url'] = f"https://www.youtube.com/watch?v={video_id}"
+        Yields:
+            tuple: (key, run) in completion order
+        """
+        started = time.monotonic()
+        deadlines = {key: started + (timeouts or {}).get(key, timeout) for key in runs}
+        pending = dict(runs)
+        delay = POLL_INITIAL_DELAY
+        
+        while pending:
+            for key, run in list(pending.items()):
+                if run.get("status") not in TERMINAL_STATUSES:
+                    run = self.client.run(run["id"]).get() or run
+                
+                cancelled = cancel_event is not None and cancel_event.is_set()
+                if run.get("status") in TERMINAL_STATUSES:
+                    del pending[key]
+                    yield key, run
+                elif cancelled or time.monotonic() >= deadlines[key]:
+                    logger.warning(f"Aborting Apify run {run['id']} ({'cancelled' if cancelled else 'deadline reached'})")
+                    del pending[key]
+                    yield key, self.abort_run(run)
+                else:
+                    pending[key] = run
             
-            logger.info(f"Found {len(items)} YouTube results for query: {query}")
-            return items
+            if pending:
+                remaining = min(deadlines[key] for key in pending) - time.monotonic()
+                time.sleep(max(0, min(delay, remaining)))
+                delay = min(delay * POLL_BACKOFF, APIFY_POLL_MAX_DELAY)
+
+    def wait_for_run(self, run, timeout=APIFY_RUN_TIMEOUT, cancel_event=None):
+        """
+        Wait for a single run, aborting it after `timeout` seconds.
+        
+        Returns:
+            dict: The finished or aborted run
+        """
+        for _, finished in self.as_completed({run["id"]: run}, timeout, cancel_event=cancel_event):
+            return finished
+
+    def iter_dataset_items(self, dataset_id, fields=None, page_size=APIFY_PAGE_SIZE):
+        """
+        Page through a dataset, yielding items as soon as their page arrives.
+        
+        The next page is downloaded in the background while the caller
+        works through the current one. The search methods consume the whole
+        generator before returning, so callers see results once all needed
+        pages are read.
+        
+        Args:
+            dataset_id (str): Dataset to read
+            fields (list): Only return these item fields, None for all
+            page_size (int): Items fetched per request
             
+        Yields:
+            dict: Dataset items in order
+        """
+        dataset = self.client.dataset(dataset_id)
+        
+        def fetch(offset):
+            return dataset.list_items(offset=offset, limit=page_size, fields=fields)
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="apify-pages") as executor:
+            next_page = executor.submit(fetch, 0)
+            offset = 0
+            while next_page is not None:
+                page = next_page.result()
+                offset += len(page.items)
+                has_more = len(page.items) == page_size and not (isinstance(page.total, int) and offset >= page.total)
+                next_page = executor.submit(fetch, offset) if has_more else None
+                yield from page.items
+
+    def run_items(self, run, fields=None):
+        """
+        Stream the dataset items of a finished run.
+        
+        Args:
+            run (dict): Finished run
+            fields (list): Only return these item fields, None for all
+            
+        Returns:
+            generator: Dataset items, see `iter_dataset_items`
+            
+        Raises:
+            Exception: If the run did not succeed
+        """
+        if run.get("status") != "SUCCEEDED":
+            raise Exception(f"Apify run {run.get('id')} ended with status {run.get('status')}")
+        return self.iter_dataset_items(run["defaultDatasetId"], fields=fields)
+
+    def start_youtube_search(self, queries, max_results=DEFAULT_MAX_RESULTS):
+        """Start a multi-query YouTube search run; see `youtube_results`."""
+        return self.start_run(YOUTUBE_ACTOR_ID, _youtube_input(queries, max_results))
+
+    def youtube_results(self, run, queries):
+        """
+        Collect the results of a finished YouTube search run.
+        
+        All pages are read before returning, since the results are cached
+        per query; paging only bounds the size of each request.
+        
+        Returns:
+            dict: Results keyed by query, in query order
+        """
+        by_query = _split_by_query(_ensure_urls(self.run_items(run, YOUTUBE_FIELDS)), queries)
+        
+        for query in queries:
+            logger.info(f"Found {len(by_query[query])} YouTube results for query: {query}")
+        return by_query
+
+    def start_instagram_search(self, usernames, max_results=DEFAULT_MAX_RESULTS):
+        """Start a multi-account Instagram run; see `instagram_results`."""
+        return self.start_run(INSTAGRAM_ACTOR_ID, _instagram_input(usernames, max_results))
+
+    def instagram_results(self, run, usernames, max_results=DEFAULT_MAX_RESULTS):
+        """
+        Collect the posts of a finished Instagram run.
+        
+        Pages are read until every account has `max_results` posts or the
+        dataset ends, and the posts are returned together.
+        
+        Returns:
+            dict: Posts keyed by username, in username order
+        """
+        by_username = _group_by_owner(self.run_items(run, INSTAGRAM_FIELDS), usernames, max_results)
+        
+        for username in usernames:
+            logger.info(f"Found {len(by_username[username])} Instagram posts for {username}")
+        return by_username
+
+    def search_youtube_podcasts(self, query, max_results=DEFAULT_MAX_RESULTS):
+        """
+        Search for YouTube podcasts with enhanced error handling.
+        """
+        return self.search_youtube_podcasts_multi([query], max_results).get(query, [])
+
+    def search_youtube_podcasts_multi(self, queries, max_results=DEFAULT_MAX_RESULTS, timeout=APIFY_RUN_TIMEOUT):
+        """
+        Search YouTube for several queries in a single actor run.
+        
+        Each query is cached under its normalized actor input, so only
+        queries without a fresh cached result are sent to the actor, and a
+        query that another session is already searching is waited for
+        instead of searched again. Results that could not be matched to a
+        query are returned under `None`, and nothing from such a run is
+        cached.
+        
+        Args:
+            queries (list): Search queries
+            max_results (int): Maximum number of results per query
+            timeout (float): Seconds to wait before aborting the run
+            
+        Returns:
+            dict: Results keyed by query, in query order; empty on failure
+        """
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return {}
+        
+        keys = {query: _cache_key(YOUTUBE_ACTOR_ID, _youtube_input([_normalize_query(query)], max_results)) for query in queries}
+        # Queries differing only in case or spacing share a key and are searched once
+        query_for_key = {}
+        for query in queries:
+            query_for_key.setdefault(keys[query], query)
+        unmatched = []
+        
+        def load(missing_keys):
+            missing = [query_for_key[key] for key in missing_keys]
+            logger.info(f"Searching YouTube for {len(missing)} of {len(queries)} queries not in the cache")
+            run = self.wait_for_run(self.start_youtube_search(missing, max_results), timeout)
+            by_query = self.youtube_results(run, missing)
+            run_unmatched = by_query.pop(None, [])
+            unmatched.extend(run_unmatched)
+            if run_unmatched:
+                # Some of the queries' results are in the unmatched items, so none of them are complete
+                return {keys[query]: Uncached(items) for query, items in by_query.items()}
+            return {keys[query]: items for query, items in by_query.items()}
+        
+        try:
+            cached = self.cache.get_many(list(keys.values()), load, CACHE_TTLS[YOUTUBE_ACTOR_ID])
         except Exception as e:
             logger.error(f"YouTube search failed: {str(e)}")
-            return []
+            return {}
+        
+        # Callers may modify the items, so never hand out the cached objects
+        by_query = {query: copy.deepcopy(cached[keys[query]]) for query in queries}
+        if unmatched:
+            by_query[None] = unmatched
+        return by_query
 
     def search_instagram_posts(self, username, max_results=DEFAULT_MAX_RESULTS):
         """
         Search for Instagram posts with enhanced error handling.
         """
-        actor_input = {
-            "directUrls": [f"https://www.instagram.com/{username}"],
-            "resultsType": "stories",
-            "resultsLimit": max_results
+        return self.search_instagram_posts_bulk([username], max_results).get(username, [])
+
+    def search_instagram_posts_bulk(self, usernames, max_results=DEFAULT_MAX_RESULTS, timeout=APIFY_RUN_TIMEOUT):
+        """
+        Fetch posts of several Instagram accounts in a single actor run.
+        
+        Accounts are cached like the queries of `search_youtube_podcasts_multi`,
+        and only accounts without fresh cached posts are fetched. Accounts
+        that come back empty from a multi-account run are not cached.
+        
+        Args:
+            usernames (list): Instagram usernames
+            max_results (int): Maximum number of posts per account
+            timeout (float): Seconds to wait before aborting the run
+            
+        Returns:
+            dict: Posts keyed by username, in username order; empty lists on failure
+        """
+        usernames = list(dict.fromkeys(usernames))
+        if not usernames:
+            return {}
+        
+        keys = {
+            username: _cache_key(INSTAGRAM_ACTOR_ID, _instagram_input([username], max_results))
+            for username in usernames
         }
+        username_for_key = {}
+        for username in usernames:
+            username_for_key.setdefault(keys[username], username)
+        
+        def load(missing_keys):
+            missing = [username_for_key[key] for key in missing_keys]
+            logger.info(f"Searching Instagram posts for usernames: {', '.join(missing)}")
+            run = self.wait_for_run(self.start_instagram_search(missing, max_results), timeout)
+            by_username = self.instagram_results(run, missing, max_results)
+            # An account with no posts in a shared run may just have failed to match, so check it again next time
+            return {
+                keys[username]: Uncached(posts) if not posts and len(missing) > 1 else posts
+                for username, posts in by_username.items()
+            }
         
         try:
-            logger.info(f"Searching Instagram posts for username: {username}")
-            run = self.client.actor("shu8hvrXbJbY3Eb9W").call(run_input=actor_input)
-            items = self.client.dataset(run["defaultDatasetId"]).list_items().items
-            logger.info(f"Found {len(items)} Instagram posts for {username}")
-            return items
+            cached = self.cache.get_many(list(keys.values()), load, CACHE_TTLS[INSTAGRAM_ACTOR_ID])
+            return {username: copy.deepcopy(cached[keys[username]]) for username in usernames}
             
         except Exception as e:
-            logger.error(f"Instagram search failed for {username}: {str(e)}")
-            return []
+            logger.error(f"Instagram search failed for {', '.join(usernames)}: {str(e)}")
+            return {username: [] for username in usernames}
 
 # Initialize the service
-apify_service = ApifyService() 
\ No newline at end of file
+apify_service = ApifyService()
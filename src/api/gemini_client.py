@@ -1,18 +1,313 @@
 import logging
 import os
+import base64
 import time
+from datetime import datetime, timezone
 import requests
-from src.config.settings import GEMINI_API_KEY, GEMINI_MODEL
+from src.config.settings import (
+    GEMINI_API_KEY, GEMINI_MODEL, GEMINI_UPLOAD_CHUNK_MB, GEMINI_UPLOAD_MAX_RETRIES, GEMINI_FILE_ACTIVE_TIMEOUT,
+    GEMINI_FILE_CACHE_ENABLED, GEMINI_FILE_CACHE_PATH, GEMINI_INLINE_MAX_MB
+)
+from src.api.http_client import get_session
+from src.utils.hashing import file_sha256
+from src.utils.json_cache import JsonFileCache
 
 logger = logging.getLogger(__name__)
 
-def gemini_process_video(video_path):
+BASE_URL = "https://generativelanguage.googleapis.com"
+MIME_TYPE = "video/mp4"
+
+# Every chunk except the last must be a multiple of the upload granularity
+UPLOAD_GRANULARITY = 256 * 1024
+
+# File state polling backoff, in seconds
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 5.0
+POLL_BACKOFF = 1.5
+
+# Uploaded files live for 48 hours; stop reusing them an hour early
+DEFAULT_FILE_LIFETIME = 48 * 3600
+FILE_EXPIRY_MARGIN = 3600
+
+# Maps video content hash to the URI of its uploaded Gemini file
+file_cache = JsonFileCache(GEMINI_FILE_CACHE_PATH)
+
+def _start_upload_args(num_bytes, display_name):
+    """Build the URL, headers and metadata that open a resumable upload session."""
+    return {
+        "url": f"{BASE_URL}/upload/v1beta/files?key={GEMINI_API_KEY}",
+        "headers": {
+            "X-Goog-Upload-Protocol": "resumable",
+            "X-Goog-Upload-Command": "start",
+            "X-Goog-Upload-Header-Content-Length": str(num_bytes),
+            "X-Goog-Upload-Header-Content-Type": MIME_TYPE,
+            "Content-Type": "application/json"
+        },
+        "json": {"file": {"display_name": display_name}}
+    }
+
+def _upload_session(response):
+    """
+    Read the upload URL and chunk granularity from a start response.
+
+    Returns:
+        tuple: (upload_url, chunk_granularity)
+    """
+    upload_url = response.headers.get("x-goog-upload-url")
+    if not upload_url:
+        raise Exception("Failed to initiate upload session")
+
+    granularity = int(response.headers.get("x-goog-upload-chunk-granularity", UPLOAD_GRANULARITY))
+    return upload_url, granularity
+
+def _start_upload(num_bytes, display_name):
+    """
+    Open a resumable upload session.
+
+    Returns:
+        tuple: (upload_url, chunk_granularity)
+    """
+    response = get_session().post(**_start_upload_args(num_bytes, display_name))
+    return _upload_session(response)
+
+def _query_upload(upload_url):
+    """
+    Ask the upload session how many bytes it has persisted.
+
+    Returns:
+        requests.Response: Response carrying X-Goog-Upload-Status and X-Goog-Upload-Size-Received
+    """
+    response = get_session().post(upload_url, headers={"X-Goog-Upload-Command": "query"})
+    response.raise_for_status()
+    return response
+
+def _chunk_headers(offset, length, is_last):
+    return {
+        "Content-Length": str(length),
+        "X-Goog-Upload-Offset": str(offset),
+        "X-Goog-Upload-Command": "upload, finalize" if is_last else "upload"
+    }
+
+def _upload_file(upload_url, video_path, num_bytes, chunk_size, max_retries=GEMINI_UPLOAD_MAX_RETRIES):
+    """
+    Stream a file to a resumable upload session in chunks.
+
+    Only one chunk is held in memory at a time. When a chunk fails, the
+    session is queried for the last acknowledged offset and the upload resumes
+    from there, up to `max_retries` consecutive failures.
+
+    Returns:
+        dict: The uploaded file resource
+    """
+    offset = 0
+    failures = 0
+    with open(video_path, "rb") as f:
+        while True:
+            f.seek(offset)
+            chunk = f.read(chunk_size)
+            is_last = offset + len(chunk) >= num_bytes
+            headers = _chunk_headers(offset, len(chunk), is_last)
+
+            try:
+                response = get_session().post(upload_url, headers=headers, data=chunk)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                failures += 1
+                if failures > max_retries:
+                    raise
+                logger.warning(f"Upload chunk at offset {offset} failed ({str(e)}), resuming (attempt {failures}/{max_retries})")
+                time.sleep(_retry_delay(failures))
+
+                status = _query_upload(upload_url)
+                if status.headers.get("x-goog-upload-status") == "final":
+                    return status.json()["file"]
+                offset = int(status.headers.get("x-goog-upload-size-received", offset))
+                continue
+
+            failures = 0
+            if is_last:
+                return response.json()["file"]
+            offset += len(chunk)
+
+def _retry_delay(failures):
+    return min(2 ** failures, 10)
+
+def _is_active(file_info, started):
+    """
+    Check the state of an uploaded file.
+
+    Raises:
+        Exception: If processing failed
+    """
+    state = file_info.get("state", "PROCESSING")
+    if state == "ACTIVE":
+        logger.info(f"Gemini file {file_info.get('name')} ready after {time.monotonic() - started:.1f}s")
+        return True
+    if state == "FAILED":
+        error = file_info.get("error", {}).get("message", "unknown error")
+        raise Exception(f"Gemini file processing failed: {error}")
+    return False
+
+def _file_url(file_info):
+    return f"{BASE_URL}/v1beta/{file_info['name']}?key={GEMINI_API_KEY}"
+
+def _wait_for_active(uploaded_file, timeout=GEMINI_FILE_ACTIVE_TIMEOUT):
+    """
+    Poll an uploaded file until Gemini has finished processing it.
+
+    Polling starts quickly and backs off, so short videos are used as soon as
+    they are ready while long ones don't hammer the API.
+
+    Returns:
+        dict: The file resource once its state is ACTIVE
+
+    Raises:
+        Exception: If processing fails
+        TimeoutError: If the file is not ready within `timeout` seconds
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    delay = POLL_INITIAL_DELAY
+    file_info = uploaded_file
+
+    while True:
+        if _is_active(file_info, started):
+            return file_info
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Gemini file {file_info.get('name')} not ready after {timeout} seconds")
+        time.sleep(min(delay, remaining))
+        delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
+
+        response = get_session().get(_file_url(file_info))
+        response.raise_for_status()
+        file_info = response.json()
+
+def _parse_expiration(expiration_time):
+    """
+    Convert an RFC 3339 expirationTime into a Unix timestamp.
+
+    Returns:
+        float: Expiry time, or None if the value can't be parsed
+    """
+    try:
+        value = expiration_time.rstrip("Z")
+        if "." in value:
+            # The API returns nanoseconds, which datetime can't parse
+            seconds, fraction = value.split(".", 1)
+            value = f"{seconds}.{fraction[:6]}"
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+def _chunk_size(chunk_size_mb, granularity):
+    return max(granularity, (chunk_size_mb * 1024 * 1024) // granularity * granularity)
+
+def _upload_video(video_path, chunk_size_mb):
+    """
+    Upload a video and wait until Gemini can use it.
+
+    Returns:
+        dict: The ACTIVE file resource
+    """
+    display_name = "Podcast Analysis Video"
+    num_bytes = os.path.getsize(video_path)
+
+    # Initialize upload
+    upload_url, granularity = _start_upload(num_bytes, display_name)
+
+    # Upload video in chunks rounded down to the session's granularity
+    uploaded_file = _upload_file(upload_url, video_path, num_bytes, _chunk_size(chunk_size_mb, granularity))
+
+    # Wait for processing
+    return _wait_for_active(uploaded_file)
+
+def _cache_uploaded_file(content_hash, file_info):
+    """Remember an uploaded file's URI until shortly before it expires."""
+    expires_at = _parse_expiration(file_info.get("expirationTime"))
+    if expires_at is None:
+        expires_at = time.time() + DEFAULT_FILE_LIFETIME
+    expires_at -= FILE_EXPIRY_MARGIN
+    if expires_at > time.time():
+        file_cache.set(content_hash, {"uri": file_info["uri"], "name": file_info.get("name")}, expires_at=expires_at)
+
+GENERATE_PROMPT = """Please analyze this video and return the information in the following JSON format:
+    {
+        "title": "The title of the YouTube video",
+        "channel": "The name of the YouTube channel",
+        "channelLink": "The link to the YouTube channel",
+        "url": "The direct URL to the YouTube video"
+    }
+
+    If any field cannot be determined, use an empty string."""
+
+def _generate_args(video_part):
+    """Build the URL, headers and payload of a generateContent request."""
+    payload = {
+        "contents": [
+            {
+                "parts": [
+                    {"text": GENERATE_PROMPT},
+                    video_part
+                ]
+            }
+        ],
+        "generation_config": {
+            "maxOutputTokens": 1024,
+            "temperature": 0.5,
+            "topP": 0.8
+        }
+    }
+
+    return {
+        "url": f"{BASE_URL}/v1beta/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}",
+        "headers": {"Content-Type": "application/json"},
+        "json": payload
+    }
+
+def _generated_text(gen_result):
+    return (gen_result.get("candidates", [{}])[0]
+                      .get("content", {})
+                      .get("parts", [{}])[0]
+                      .get("text", "No analysis returned"))
+
+def _generate(video_part):
+    """
+    Ask Gemini to identify the YouTube source of a video.
+
+    Args:
+        video_part (dict): Request part holding the video, either `file_data` or `inline_data`
+
+    Returns:
+        str: Raw model response text
+    """
+    gen_response = get_session().post(**_generate_args(video_part))
+    gen_response.raise_for_status()
+    return _generated_text(gen_response.json())
+
+def _file_part(file_uri):
+    return {"file_data": {"file_uri": file_uri, "mime_type": MIME_TYPE}}
+
+def _inline_part(video_path):
+    with open(video_path, "rb") as f:
+        data = base64.b64encode(f.read()).decode("ascii")
+    return {"inline_data": {"mime_type": MIME_TYPE, "data": data}}
+
+def gemini_process_video(video_path, chunk_size_mb=GEMINI_UPLOAD_CHUNK_MB, inline_max_mb=GEMINI_INLINE_MAX_MB):
     """
     Process video content using Google's Gemini API.
-    
+
+    Videos smaller than `inline_max_mb` are sent inline with the request.
+    Larger ones go through the Files API, and uploaded files are remembered by
+    content hash, so analyzing the same video again reuses the earlier upload
+    until it expires.
+
     Args:
         video_path (str): Path to the video file
-        
+        chunk_size_mb (int): Size of each upload chunk in MB
+        inline_max_mb (float): Largest video sent inline, in MB
+
     Returns:
         dict: Analysis results or error information
     """
@@ -20,88 +315,37 @@ def gemini_process_video(video_path):
         if not os.path.exists(video_path):
             return {"error": f"Video file not found: {video_path}"}
 
-        API_KEY = GEMINI_API_KEY
-        BASE_URL = "https://generativelanguage.googleapis.com"
-        UPLOAD_ENDPOINT = f"{BASE_URL}/upload/v1beta/files?key={API_KEY}"
-        GENERATE_ENDPOINT = f"{BASE_URL}/v1beta/models/{GEMINI_MODEL}:generateContent?key={API_KEY}"
-
-        mime_type = "video/mp4"
-        display_name = "Podcast Analysis Video"
+        started = time.monotonic()
         num_bytes = os.path.getsize(video_path)
+        if num_bytes <= inline_max_mb * 1024 * 1024:
+            analysis_text = _generate(_inline_part(video_path))
+            logger.info(f"Gemini inline analysis of {num_bytes / (1024 * 1024):.1f}MB video took {time.monotonic() - started:.1f}s")
+            return {"raw_response": analysis_text}
 
-        # Initialize upload
-        headers = {
-            "X-Goog-Upload-Protocol": "resumable",
-            "X-Goog-Upload-Command": "start",
-            "X-Goog-Upload-Header-Content-Length": str(num_bytes),
-            "X-Goog-Upload-Header-Content-Type": mime_type,
-            "Content-Type": "application/json"
-        }
-        metadata = {"file": {"display_name": display_name}}
+        content_hash = file_sha256(video_path) if GEMINI_FILE_CACHE_ENABLED else None
+        cached_file = file_cache.get(content_hash) if content_hash else None
 
-        response = requests.post(UPLOAD_ENDPOINT, headers=headers, json=metadata)
-        upload_url = response.headers.get("x-goog-upload-url")
-        if not upload_url:
-            raise Exception("Failed to initiate upload session")
+        if cached_file:
+            logger.info(f"Reusing Gemini upload {cached_file.get('name')}")
+            try:
+                analysis_text = _generate(_file_part(cached_file["uri"]))
+            except requests.exceptions.HTTPError as e:
+                # The file was deleted or expired early, so forget it and upload again
+                logger.warning(f"Cached Gemini file unusable ({str(e)}), uploading again")
+                file_cache.delete(content_hash)
+                cached_file = None
 
-        # Upload video
-        with open(video_path, "rb") as f:
-            video_data = f.read()
+        if not cached_file:
+            file_info = _upload_video(video_path, chunk_size_mb)
+            if content_hash:
+                _cache_uploaded_file(content_hash, file_info)
+            analysis_text = _generate(_file_part(file_info["uri"]))
 
-        upload_headers = {
-            "Content-Length": str(num_bytes),
-            "X-Goog-Upload-Offset": "0",
-            "X-Goog-Upload-Command": "upload, finalize"
-        }
-        upload_response = requests.post(upload_url, headers=upload_headers, data=video_data)
-        upload_response.raise_for_status()
-        upload_result = upload_response.json()
-        file_uri = upload_result["file"]["uri"]
-
-        # Wait for processing
-        time.sleep(10)
-
-        # Generate content analysis
-        prompt = """Please analyze this video and return the information in the following JSON format:
-        {
-            "title": "The title of the YouTube video",
-            "channel": "The name of the YouTube channel",
-            "channelLink": "The link to the YouTube channel",
-            "url": "The direct URL to the YouTube video"
-        }
-        
-        If any field cannot be determined, use an empty string."""
-
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {"text": prompt},
-                        {"file_data": {"file_uri": file_uri, "mime_type": mime_type}}
-                    ]
-                }
-            ],
-            "generation_config": {
-                "maxOutputTokens": 1024,
-                "temperature": 0.5,
-                "topP": 0.8
-            }
-        }
-        
-        generate_headers = {"Content-Type": "application/json"}
-        gen_response = requests.post(GENERATE_ENDPOINT, headers=generate_headers, json=payload)
-        gen_response.raise_for_status()
-        gen_result = gen_response.json()
-
-        analysis_text = (gen_result.get("candidates", [{}])[0]
-                                .get("content", {})
-                                .get("parts", [{}])[0]
-                                .get("text", "No analysis returned"))
-
-        logger.info("Video analysis completed successfully")
+        logger.info(f"Gemini file analysis of {num_bytes / (1024 * 1024):.1f}MB video took {time.monotonic() - started:.1f}s "
+                    f"({'cached upload' if cached_file else 'new upload'})")
         return {"raw_response": analysis_text}
 
     except Exception as e:
         error_msg = f"Error in Gemini processing: {str(e)}"
         logger.error(error_msg)
-        return {"error": error_msg} 
\ No newline at end of file
+        return {"error": error_msg}
@@ -0,0 +1,124 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from src.config.settings import (
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_POOL_MAXSIZE, HTTP_API_POOL_MAXSIZE, HTTP_ASYNC_MAX_CONNECTIONS,
+    HTTP2_ENABLED
+)
+
+logger = logging.getLogger(__name__)
+
+# Hosts that see many short concurrent requests get their own, larger pools
+API_HOSTS = (
+    "https://api.perplexity.ai",
+    "https://generativelanguage.googleapis.com",
+)
+
+class TimeoutSession(requests.Session):
+    """Session that applies default connect and read timeouts to every request."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+def create_session(pool_maxsize=HTTP_POOL_MAXSIZE, api_pool_maxsize=HTTP_API_POOL_MAXSIZE,
+                   timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)):
+    """
+    Create a session with keep-alive connection pools.
+
+    Args:
+        pool_maxsize (int): Connections kept alive per host
+        api_pool_maxsize (int): Connections kept alive per API host in `API_HOSTS`
+        timeout (tuple): Default (connect, read) timeout in seconds
+
+    Returns:
+        TimeoutSession: The configured session
+    """
+    session = TimeoutSession(timeout)
+    default_adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+    for host in API_HOSTS:
+        session.mount(host, HTTPAdapter(pool_connections=1, pool_maxsize=api_pool_maxsize))
+    return session
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Get the process-wide HTTP session.
+
+    The session is created on first use and shared by all threads, so
+    connections to the same host are reused across calls instead of opening
+    a new TCP and TLS connection every time.
+
+    Returns:
+        TimeoutSession: The shared session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+                logger.debug("Created shared HTTP session")
+    return _session
+
+def http2_available():
+    """Check whether HTTP/2 is enabled and the optional h2 package is installed."""
+    return HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+def create_async_client(max_connections=HTTP_ASYNC_MAX_CONNECTIONS, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)):
+    """
+    Create an async client with a keep-alive connection pool.
+
+    Args:
+        max_connections (int): Maximum number of concurrent connections
+        timeout (tuple): Default (connect, read) timeout in seconds
+
+    Returns:
+        httpx.AsyncClient: The configured client
+    """
+    connect_timeout, read_timeout = timeout
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        http2=http2_available(),
+        follow_redirects=True
+    )
+
+# One async client per event loop, since httpx connections can't move between loops
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_async_client():
+    """
+    Get the shared async HTTP client for the running event loop.
+
+    All coroutines on the same loop share one client, so concurrent requests
+    to the same host reuse its pooled connections.
+
+    Returns:
+        httpx.AsyncClient: The shared client
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_async_client()
+        _async_clients[loop] = client
+        logger.debug(f"Created shared async HTTP client (HTTP/2 {'on' if http2_available() else 'off'})")
+    return client
+
+async def close_async_client():
+    """Close the running event loop's shared async client, if any."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,19 +1,134 @@
+import json
 import logging
+import threading
 from openai import OpenAI
-from src.config.settings import OPENAI_API_KEY, WHISPER_MODEL
+from src.config.settings import OPENAI_API_KEY, WHISPER_MODEL, FORMAT_BATCH_MAX_CHARS
+from src.utils.response_parser import extract_video_info, VIDEO_INFO_FIELDS
+from src.utils.batching import split_batches
 
 logger = logging.getLogger(__name__)
 
+FORMAT_MODEL = "gpt-4o-mini"
+
+BATCH_FORMAT_PROMPT = """You are a JSON formatting assistant. You will receive a JSON object that maps IDs to raw API responses. For each ID, extract the YouTube video information from its response with these fields:
+- title: The title of the YouTube video
+- channel: The name of the YouTube channel
+- channelLink: The link to the YouTube channel
+- url: The direct URL to the YouTube video
+
+Look for this information in the entire response, including any thinking process or analysis. If any field cannot be determined, use an empty string.
+Return only a JSON object of the form {"results": {"<id>": {"title": "", "channel": "", "channelLink": "", "url": ""}}} with one entry for every ID."""
+
+FORMAT_PROMPT = """You are a JSON formatting assistant. Extract the YouTube video information from the provided response and return it as a JSON object with these fields:
+            - title: The title of the YouTube video
+            - channel: The name of the YouTube channel
+            - channelLink: The link to the YouTube channel
+            - url: The direct URL to the YouTube video
+            
+            Look for this information in the entire response, including any thinking process or analysis. Return only the JSON object."""
+
+def _format_request(raw_response):
+    """Build the chat completion arguments for formatting one response."""
+    user_prompt = f"Here's the complete response. Please extract the video information and return it as JSON:\n{raw_response}"
+    return {
+        "model": FORMAT_MODEL,
+        "messages": [
+            {"role": "system", "content": FORMAT_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        "response_format": { "type": "json_object" }
+    }
+
+def _parse_formatted(completion):
+    """Read the formatted video info from a chat completion."""
+    formatted_response = completion.choices[0].message.content
+    logger.info("Successfully formatted JSON response")
+    
+    # Ensure all required fields are present
+    formatted_dict = eval(formatted_response)
+    for field in VIDEO_INFO_FIELDS:
+        if field not in formatted_dict:
+            formatted_dict[field] = ""
+            
+    return formatted_dict
+
+def _format_error(e):
+    error_msg = f"Error in GPT formatting: {str(e)}"
+    logger.error(error_msg)
+    return {
+        "title": "",
+        "channel": "",
+        "channelLink": "",
+        "url": "",
+        "error": str(e)
+    }
+
+def _batch_request(batch):
+    """Build the chat completion arguments for formatting a batch of responses keyed by string ID."""
+    return {
+        "model": FORMAT_MODEL,
+        "messages": [
+            {"role": "system", "content": BATCH_FORMAT_PROMPT},
+            {"role": "user", "content": json.dumps(batch)}
+        ],
+        "response_format": { "type": "json_object" }
+    }
+
+def _parse_batch(completion, batch):
+    """
+    Read the formatted items of a batch reply.
+    
+    Returns:
+        dict: Formatted responses keyed by ID, only for items that passed validation
+    """
+    results = json.loads(completion.choices[0].message.content).get("results", {})
+    if not isinstance(results, dict):
+        return {}
+    
+    return {
+        key: {field: results[key][field] for field in VIDEO_INFO_FIELDS}
+        for key in batch
+        if _valid_video_info(results.get(key))
+    }
+
+def _log_batch(batch, batch_results):
+    """
+    Log how much of a batch GPT formatted.
+    
+    Returns:
+        list: IDs that have to be retried individually
+    """
+    retries = [key for key in batch if key not in batch_results]
+    logger.info(f"Formatted {len(batch) - len(retries)}/{len(batch)} responses in one GPT request"
+                f"{f', retrying {len(retries)} individually' if retries else ''}")
+    return retries
+
+def _valid_video_info(item):
+    """Check that a formatted item has every video info field as a string."""
+    return isinstance(item, dict) and all(isinstance(item.get(field), str) for field in VIDEO_INFO_FIELDS)
+
 class OpenAIService:
     def __init__(self):
         self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self._format_stats = {"local": 0, "llm": 0}
+        self._format_stats_lock = threading.Lock()
+    
+    def _record_format(self, local=0, llm=0):
+        """Count how responses were formatted and log the share that needed GPT."""
+        with self._format_stats_lock:
+            self._format_stats["local"] += local
+            self._format_stats["llm"] += llm
+            local_count, llm_count = self._format_stats["local"], self._format_stats["llm"]
+        total = local_count + llm_count
+        logger.info(f"JSON formatting: {llm_count}/{total} responses needed GPT ({100 * llm_count / total:.0f}%)")
     
-    def transcribe_audio(self, audio_file_path):
+    def transcribe_audio(self, audio_file_path, raise_on_error=False):
         """
         Transcribe audio using OpenAI's Whisper model.
         
         Args:
             audio_file_path (str): Path to the audio file
+            raise_on_error (bool): Raise failures instead of returning them as the transcript
             
         Returns:
             str: Transcribed text or error message
@@ -31,11 +146,16 @@ class OpenAIService:
         except Exception as e:
             error_msg = f"Transcription failed: {str(e)}"
             logger.error(error_msg)
+            if raise_on_error:
+                raise
             return error_msg
     
     def format_json_response(self, raw_response):
         """
-        Use GPT to format raw response into valid JSON.
+        Format raw response into valid JSON, using GPT only when needed.
+        
+        Responses that already contain the video information are parsed
+        locally; the rest are sent to GPT.
         
         Args:
             raw_response (str): Raw API response to format
@@ -43,48 +163,98 @@ class OpenAIService:
         Returns:
             dict: Formatted JSON response
         """
-        try:
-            system_prompt = """You are a JSON formatting assistant. Extract the YouTube video information from the provided response and return it as a JSON object with these fields:
-            - title: The title of the YouTube video
-            - channel: The name of the YouTube channel
-            - channelLink: The link to the YouTube channel
-            - url: The direct URL to the YouTube video
-            
-            Look for this information in the entire response, including any thinking process or analysis. Return only the JSON object."""
-            
-            user_prompt = f"Here's the complete response. Please extract the video information and return it as JSON:\n{raw_response}"
+        info, confident = extract_video_info(raw_response)
+        if confident:
+            self._record_format(local=1)
+            logger.info("Formatted JSON response locally")
+            return info
+        
+        self._record_format(llm=1)
+        return self._format_with_gpt(raw_response)
+    
+    def _format_with_gpt(self, raw_response):
+        """
+        Format a single raw response with GPT.
+        
+        Args:
+            raw_response (str): Raw API response to format
             
-            completion = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format={ "type": "json_object" }
-            )
+        Returns:
+            dict: Formatted JSON response
+        """
+        try:
+            completion = self.client.chat.completions.create(**_format_request(raw_response))
+            return _parse_formatted(completion)
+        except Exception as e:
+            return _format_error(e)
+    
+    def _format_batch(self, batch):
+        """
+        Format several raw responses with a single GPT request.
+        
+        Args:
+            batch (dict): Raw responses keyed by string ID
             
-            formatted_response = completion.choices[0].message.content
-            logger.info("Successfully formatted JSON response")
+        Returns:
+            dict: Formatted responses keyed by ID, only for items that passed validation
+        """
+        completion = self.client.chat.completions.create(**_batch_request(batch))
+        return _parse_batch(completion, batch)
+    
+    def format_json_responses(self, raw_responses, max_chars=FORMAT_BATCH_MAX_CHARS):
+        """
+        Format many raw responses, batching the ones that need GPT.
+        
+        Responses that already contain the video information are parsed
+        locally. The rest are sent to GPT together in JSON mode, split into
+        several requests when their combined length exceeds `max_chars`.
+        Items missing from a batch reply or failing validation are retried
+        one at a time.
+        
+        Args:
+            raw_responses (dict): Raw API responses keyed by post ID
+            max_chars (int): Maximum combined response length per GPT request
             
-            # Ensure all required fields are present
-            required_fields = ['title', 'channel', 'channelLink', 'url']
-            formatted_dict = eval(formatted_response)
-            for field in required_fields:
-                if field not in formatted_dict:
-                    formatted_dict[field] = ""
-                    
-            return formatted_dict
+        Returns:
+            dict: Formatted JSON responses keyed by post ID, in input order
+        """
+        if not raw_responses:
+            return {}
+        
+        formatted, pending = self._format_locally(raw_responses)
+        
+        for batch in split_batches(pending.items(), max_chars):
+            try:
+                batch_results = self._format_batch(batch)
+            except Exception as e:
+                logger.warning(f"Batch GPT formatting of {len(batch)} responses failed: {str(e)}")
+                batch_results = {}
             
-        except Exception as e:
-            error_msg = f"Error in GPT formatting: {str(e)}"
-            logger.error(error_msg)
-            return {
-                "title": "",
-                "channel": "",
-                "channelLink": "",
-                "url": "",
-                "error": str(e)
-            }
-
+            for key in _log_batch(batch, batch_results):
+                batch_results[key] = self._format_with_gpt(batch[key])
+            formatted.update(batch_results)
+        
+        return {post_id: formatted[str(post_id)] for post_id in raw_responses}
+    
+    def _format_locally(self, raw_responses):
+        """
+        Split responses into those formatted locally and those that need GPT.
+        
+        Returns:
+            tuple: (formatted responses, pending raw responses), both keyed by string ID
+        """
+        formatted = {}
+        pending = {}
+        for post_id, raw_response in raw_responses.items():
+            info, confident = extract_video_info(raw_response)
+            # JSON object keys must be strings
+            if confident:
+                formatted[str(post_id)] = info
+            else:
+                pending[str(post_id)] = str(raw_response)
+        
+        self._record_format(local=len(formatted), llm=len(pending))
+        return formatted, pending
+    
 # Initialize the service
 openai_service = OpenAIService() 
\ No newline at end of file
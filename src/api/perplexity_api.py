@@ -1,81 +1,245 @@
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import requests
-from src.config.settings import PERPLEXITY_API_KEY, PERPLEXITY_MODEL
+from src.config.settings import PERPLEXITY_API_KEY, PERPLEXITY_MODEL, PERPLEXITY_BATCH_MAX_TOKENS, ANALYSIS_MAX_WORKERS, HTTP_CONNECT_TIMEOUT
+from src.api.http_client import get_async_client, get_session
+from src.utils.batching import estimate_tokens, split_batches
+from src.utils.response_parser import matches_schema, validate_structured
 
 logger = logging.getLogger(__name__)
 
-def perplexity_search(input_text, prompt_template):
+API_URL = "https://api.perplexity.ai/chat/completions"
+REQUEST_TIMEOUT = 60  # seconds
+
+def _missing_input(input_text, prompt_template):
+    """Return the error for missing input, or None when both are given."""
+    if not input_text or not prompt_template:
+        return {
+            "error": "Missing required input",
+            "details": "Both input_text and prompt_template are required"
+        }
+    return None
+
+def _request_args(input_text, prompt_template, response_schema):
+    """Build the URL, headers and JSON payload of a chat completion request."""
+    payload = {
+        "model": PERPLEXITY_MODEL,
+        "messages": [
+            {"role": "system", "content": "Return JSON response"},
+            {"role": "user", "content": prompt_template.format(input_text)}
+        ]
+    }
+    if response_schema:
+        payload["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"schema": response_schema}
+        }
+    
+    return {
+        "url": API_URL,
+        "headers": {
+            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        "json": payload
+    }
+
+def _parse_response(response, response_schema):
+    """
+    Turn a chat completion response into a search result.
+    
+    Works with both `requests` and `httpx` responses.
+    """
+    response.raise_for_status()
+    
+    if not response.text.strip():
+        return {
+            "error": "Empty API response",
+            "details": "The API returned an empty response",
+            "status_code": response.status_code
+        }
+    
+    result = response.json()
+    logger.debug(f"Raw API Response: {result}")
+    raw_text = result["choices"][0]["message"]["content"]
+    
+    if response_schema:
+        structured = validate_structured(raw_text, response_schema)
+        if structured is not None:
+            return {
+                "raw_response": raw_text,
+                "structured": structured
+            }
+        logger.warning("Perplexity response did not match the requested schema")
+    
+    return {
+        "raw_response": raw_text
+    }
+
+def _timeout_error():
+    error_msg = f"API timeout after {REQUEST_TIMEOUT} seconds"
+    logger.error(error_msg)
+    return {
+        "error": "API timeout",
+        "details": error_msg
+    }
+
+def _request_error(e):
+    error_msg = f"API request failed: {str(e)}"
+    logger.error(error_msg)
+    return {
+        "error": "API request failed",
+        "details": error_msg
+    }
+
+def _unexpected_error(e, response):
+    error_msg = f"Unexpected error: {str(e)}"
+    logger.error(error_msg)
+    return {
+        "error": "Unexpected error",
+        "details": error_msg,
+        "raw_response": response.text if response is not None else None
+    }
+
+def perplexity_search(input_text, prompt_template, response_schema=None):
     """
     Call Perplexity API with enhanced error handling and debugging.
     
     Args:
         input_text (str): The text to analyze
         prompt_template (str): The prompt template to use
+        response_schema (dict): Optional JSON schema to constrain the output to.
+            When the response validates against it, the parsed object is
+            returned under `structured`.
         
     Returns:
         dict: API response or error information
     """
     logger.debug(f"Input text: {input_text}")
     
+    response = None
     try:
-        if not input_text or not prompt_template:
-            return {
-                "error": "Missing required input",
-                "details": "Both input_text and prompt_template are required"
-            }
+        missing = _missing_input(input_text, prompt_template)
+        if missing:
+            return missing
         
-        response = requests.post(
-            "https://api.perplexity.ai/chat/completions",
-            headers={
-                "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": PERPLEXITY_MODEL,
-                "messages": [
-                    {"role": "system", "content": "Return JSON response"},
-                    {"role": "user", "content": prompt_template.format(input_text)}
-                ]
-            },
-            timeout=60
+        response = get_session().post(
+            **_request_args(input_text, prompt_template, response_schema),
+            timeout=(HTTP_CONNECT_TIMEOUT, REQUEST_TIMEOUT)
         )
-        
-        response.raise_for_status()
-        
-        if not response.text.strip():
-            return {
-                "error": "Empty API response",
-                "details": "The API returned an empty response",
-                "status_code": response.status_code
-            }
-        
-        result = response.json()
-        logger.debug(f"Raw API Response: {result}")
-        raw_text = result["choices"][0]["message"]["content"]
-        
-        return {
-            "raw_response": raw_text
-        }
+        return _parse_response(response, response_schema)
     
     except requests.exceptions.Timeout:
-        error_msg = "API timeout after 60 seconds"
-        logger.error(error_msg)
-        return {
-            "error": "API timeout",
-            "details": error_msg
-        }
+        return _timeout_error()
     except requests.exceptions.RequestException as e:
-        error_msg = f"API request failed: {str(e)}"
-        logger.error(error_msg)
-        return {
-            "error": "API request failed",
-            "details": error_msg
-        }
+        return _request_error(e)
     except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        logger.error(error_msg)
-        return {
-            "error": "Unexpected error",
-            "details": error_msg,
-            "raw_response": response.text if 'response' in locals() else None
-        } 
\ No newline at end of file
+        return _unexpected_error(e, response)
+
+async def perplexity_search_async(input_text, prompt_template, response_schema=None):
+    """
+    Async version of `perplexity_search` on the shared async HTTP client.
+    
+    Args:
+        input_text (str): The text to analyze
+        prompt_template (str): The prompt template to use
+        response_schema (dict): Optional JSON schema to constrain the output to
+        
+    Returns:
+        dict: API response or error information
+    """
+    logger.debug(f"Input text: {input_text}")
+    
+    response = None
+    try:
+        missing = _missing_input(input_text, prompt_template)
+        if missing:
+            return missing
+        
+        response = await get_async_client().post(
+            **_request_args(input_text, prompt_template, response_schema),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+        )
+        return _parse_response(response, response_schema)
+    
+    except httpx.TimeoutException:
+        return _timeout_error()
+    except httpx.HTTPError as e:
+        return _request_error(e)
+    except Exception as e:
+        return _unexpected_error(e, response)
+
+def _batch_schema(response_schema):
+    """Wrap an item schema into the schema of a batched reply: an array of items tagged with their ID."""
+    item_schema = dict(response_schema)
+    item_schema["properties"] = {"id": {"type": "string"}, **response_schema.get("properties", {})}
+    item_schema["required"] = ["id", *response_schema.get("required", [])]
+    return {
+        "type": "object",
+        "properties": {"results": {"type": "array", "items": item_schema}},
+        "required": ["results"]
+    }, item_schema
+
+def _search_batch(batch, batch_prompt_template, prompt_template, response_schema):
+    """
+    Resolve one batch with a single request, falling back to per-item requests.
+
+    Returns:
+        dict: Search results keyed by ID
+    """
+    schema, item_schema = _batch_schema(response_schema)
+    result = perplexity_search(json.dumps(batch), batch_prompt_template, response_schema=schema)
+
+    items = result.get("structured", {}).get("results", [])
+    results = {}
+    for item in items:
+        if matches_schema(item, item_schema) and item["id"] in batch and item["id"] not in results:
+            structured = {key: value for key, value in item.items() if key != "id"}
+            results[item["id"]] = {"raw_response": json.dumps(structured), "structured": structured}
+
+    malformed = [key for key in batch if key not in results]
+    logger.info(f"Perplexity batch resolved {len(results)}/{len(batch)} items"
+                f"{f', retrying {len(malformed)} individually' if malformed else ''}")
+    for key in malformed:
+        results[key] = perplexity_search(batch[key], prompt_template, response_schema=response_schema)
+    return results
+
+def perplexity_search_batch(inputs, batch_prompt_template, prompt_template, response_schema,
+                            max_tokens=PERPLEXITY_BATCH_MAX_TOKENS, max_workers=ANALYSIS_MAX_WORKERS):
+    """
+    Call Perplexity API for many inputs, packing several into each request.
+    
+    Inputs are sent as a JSON object keyed by ID and split into requests of
+    at most `max_tokens` estimated input tokens. Each reply must be a JSON
+    array of results tagged with their ID; items that are missing or fail
+    validation are retried with a per-item `perplexity_search`. Empty inputs
+    are not sent and get the missing input error.
+    
+    Args:
+        inputs (dict): Texts to analyze keyed by ID
+        batch_prompt_template (str): Prompt template for a JSON object of inputs
+        prompt_template (str): Prompt template for a single input, used for retries
+        response_schema (dict): JSON schema of a single result
+        max_tokens (int): Estimated input token budget per request
+        max_workers (int): Maximum number of requests in flight
+        
+    Returns:
+        dict: Search results keyed by ID, shaped like `perplexity_search` results
+    """
+    # JSON object keys must be strings
+    keys = {str(key): key for key in inputs}
+    # Empty inputs get the same error as in `perplexity_search` instead of spending tokens
+    results = {str(key): _missing_input(text, prompt_template) for key, text in inputs.items() if not text}
+    batches = split_batches([(str(key), text) for key, text in inputs.items() if text], max_tokens, size=estimate_tokens)
+    if batches:
+        logger.info(f"Resolving {len(inputs) - len(results)} inputs in {len(batches)} Perplexity requests")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches))), thread_name_prefix="perplexity") as executor:
+        for batch_results in executor.map(
+            lambda batch: _search_batch(batch, batch_prompt_template, prompt_template, response_schema), batches
+        ):
+            results.update(batch_results)
+
+    return {keys[key]: results[key] for key in keys}
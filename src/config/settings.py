@@ -16,12 +16,68 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 APP_TITLE = "Podcast Trend Finder"
 APP_ICON = "🎙️"
 DEFAULT_MAX_RESULTS = 10
-MAX_VIDEO_SIZE_MB = 50
+MAX_VIDEO_SIZE_MB = int(os.getenv("MAX_VIDEO_SIZE_MB", "50"))
+
+# Concurrency
+ANALYSIS_MAX_WORKERS = int(os.getenv("ANALYSIS_MAX_WORKERS", "4"))
+ANALYSIS_BATCH_TIMEOUT = int(os.getenv("ANALYSIS_BATCH_TIMEOUT", "600"))  # seconds
+
+# HTTP Connection Pooling
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))  # seconds
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "300"))  # seconds, long enough for Gemini video analysis
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))  # connections kept alive per host
+HTTP_API_POOL_MAXSIZE = int(os.getenv("HTTP_API_POOL_MAXSIZE", "20"))  # for Perplexity and Gemini
+HTTP_ASYNC_MAX_CONNECTIONS = int(os.getenv("HTTP_ASYNC_MAX_CONNECTIONS", "200"))  # in-flight requests per event loop
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"  # async client only, needs the h2 package
+
+# Video Cache
+VIDEO_CACHE_ENABLED = os.getenv("VIDEO_CACHE_ENABLED", "true").lower() == "true"
+VIDEO_CACHE_DIR = os.getenv("VIDEO_CACHE_DIR", os.path.join("cache", "videos"))
+VIDEO_CACHE_MAX_MB = int(os.getenv("VIDEO_CACHE_MAX_MB", "2048"))
+
+# Audio Extraction
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFMPEG_TIMEOUT = int(os.getenv("FFMPEG_TIMEOUT", "300"))  # seconds
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", os.path.join(VIDEO_CACHE_DIR, "audio"))
+AUDIO_BITRATE = os.getenv("AUDIO_BITRATE", "32k")
+AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", "16000"))
+
+# Transcription
+TRANSCRIPTION_SEGMENT_SECONDS = int(os.getenv("TRANSCRIPTION_SEGMENT_SECONDS", "600"))
+TRANSCRIPTION_MAX_WORKERS = int(os.getenv("TRANSCRIPTION_MAX_WORKERS", "4"))
+SILENCE_NOISE_DB = int(os.getenv("SILENCE_NOISE_DB", "-35"))
+SILENCE_MIN_SECONDS = float(os.getenv("SILENCE_MIN_SECONDS", "0.5"))
+TRANSCRIPTION_TRIM_SILENCE = os.getenv("TRANSCRIPTION_TRIM_SILENCE", "true").lower() == "true"
+TRIM_MIN_SILENCE_SECONDS = float(os.getenv("TRIM_MIN_SILENCE_SECONDS", "1.0"))
+TRIM_PADDING_SECONDS = float(os.getenv("TRIM_PADDING_SECONDS", "0.25"))
+TRANSCRIPTION_PROGRESSIVE = os.getenv("TRANSCRIPTION_PROGRESSIVE", "true").lower() == "true"
+TRANSCRIPTION_PREVIEW_SECONDS = int(os.getenv("TRANSCRIPTION_PREVIEW_SECONDS", "60"))
+TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join("cache", "transcripts"))
+TRANSCRIPT_CACHE_TTL_HOURS = int(os.getenv("TRANSCRIPT_CACHE_TTL_HOURS", "720"))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "500"))
+
+# Apify Runs
+APIFY_RUN_TIMEOUT = int(os.getenv("APIFY_RUN_TIMEOUT", "300"))  # seconds before a run is aborted
+APIFY_POLL_MAX_DELAY = float(os.getenv("APIFY_POLL_MAX_DELAY", "5"))  # seconds between run status checks
+APIFY_PAGE_SIZE = int(os.getenv("APIFY_PAGE_SIZE", "250"))  # dataset items fetched per request
+APIFY_CACHE_TTL_YOUTUBE = int(os.getenv("APIFY_CACHE_TTL_YOUTUBE", "21600"))  # seconds, 0 disables caching
+APIFY_CACHE_TTL_INSTAGRAM = int(os.getenv("APIFY_CACHE_TTL_INSTAGRAM", "3600"))  # seconds, 0 disables caching
+APIFY_CACHE_MAX_ENTRIES = int(os.getenv("APIFY_CACHE_MAX_ENTRIES", "1000"))
 
 # API Configuration
 PERPLEXITY_MODEL = "sonar-pro"
+PERPLEXITY_BATCH_MAX_TOKENS = int(os.getenv("PERPLEXITY_BATCH_MAX_TOKENS", "3000"))  # input tokens per batched request
+CAPTION_BATCH_ENABLED = os.getenv("CAPTION_BATCH_ENABLED", "true").lower() == "true"
 WHISPER_MODEL = "whisper-1"
+FORMAT_BATCH_MAX_CHARS = int(os.getenv("FORMAT_BATCH_MAX_CHARS", "24000"))  # roughly 6k prompt tokens per request
 GEMINI_MODEL = "gemini-1.5-flash"
+GEMINI_UPLOAD_CHUNK_MB = int(os.getenv("GEMINI_UPLOAD_CHUNK_MB", "8"))
+GEMINI_UPLOAD_MAX_RETRIES = int(os.getenv("GEMINI_UPLOAD_MAX_RETRIES", "3"))
+GEMINI_FILE_ACTIVE_TIMEOUT = int(os.getenv("GEMINI_FILE_ACTIVE_TIMEOUT", "120"))  # seconds
+GEMINI_INLINE_MAX_MB = float(os.getenv("GEMINI_INLINE_MAX_MB", "10"))  # 0 disables inline uploads
+GEMINI_FILE_CACHE_ENABLED = os.getenv("GEMINI_FILE_CACHE_ENABLED", "true").lower() == "true"
+GEMINI_FILE_CACHE_PATH = os.getenv("GEMINI_FILE_CACHE_PATH", os.path.join("cache", "gemini_files.json"))
 
 # Default Instagram Channels
 DEFAULT_CHANNELS = [
@@ -86,7 +86,7 @@ def main():
                             st.success("🎯 AI is satisfied with the initial search results!")
                         else:
                             st.warning("🔄 Initial results weren't ideal. Trying alternative queries...")
-                            results = natural_agent.search(query, max_results)
+                            results = natural_agent.refine(query, initial_results, evaluation, max_results)
                     
                     st.session_state.search_evaluation = evaluation
                 
@@ -130,10 +130,11 @@ def main():
                     if not usernames_list:
                         usernames_list = [channel]
                     
+                    st.write(f"Searching posts for usernames: {', '.join(usernames_list)}")
+                    posts_by_username = apify_service.search_instagram_posts_bulk(usernames_list, num_posts)
+                    
                     st.session_state.current_posts = []
-                    for username in usernames_list:
-                        st.write(f"Searching posts for username: {username}")
-                        posts = apify_service.search_instagram_posts(username, num_posts)
+                    for username, posts in posts_by_username.items():
                         st.write(f"Found {len(posts)} posts for {username}")
                         st.session_state.current_posts.extend(posts)
                     st.session_state.selected_posts = {}
@@ -3,13 +3,14 @@ Business logic services for the application.
 """
 
 from .analysis_service import analyze_selected_posts
-from .video_service import download_video
+from .video_service import download_video, shared_downloads
 from .natural_agent_service import NaturalAgentService
 from .specific_agent_service import SpecificAgentService
 
 __all__ = [
     'analyze_selected_posts',
     'download_video',
+    'shared_downloads',
     'NaturalAgentService',
     'SpecificAgentService'
 ]
@@ -1,110 +1,295 @@
 import logging
-import os
-from src.api.perplexity_api import perplexity_search
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from src.api.perplexity_api import perplexity_search, perplexity_search_batch
 from src.api.openai_client import openai_service
 from src.api.gemini_client import gemini_process_video
-from src.services.video_service import download_video
+from src.services.video_service import shared_downloads
+from src.services.transcription_service import transcribe_video, transcribe_video_preview, transcribe_video_remainder
+from src.utils.response_parser import has_youtube_video_link, VIDEO_INFO_SCHEMA
+from src.config.settings import ANALYSIS_MAX_WORKERS, ANALYSIS_BATCH_TIMEOUT, TRANSCRIPTION_PROGRESSIVE, CAPTION_BATCH_ENABLED
 
 logger = logging.getLogger(__name__)
 
-def analyze_selected_posts(posts, selected_ids, method):
+CAPTION_PROMPT = """
+        From this Instagram caption: '{}', find the exact YouTube podcast/channel and return the response in JSON format with the following fields: title, channel, channel link, the exact youtube url for the podcast/channel, we want full video of the podcast.
+        """
+
+CAPTION_BATCH_PROMPT = """
+This JSON object maps Instagram post IDs to their captions: {}
+For every caption, find the exact YouTube podcast/channel, we want full video of the podcast. Return a JSON object with a "results" array holding one entry per post with the following fields:
+- id: The post ID
+- title: The title of the YouTube video
+- channel: The name of the YouTube channel
+- channelLink: The link to the YouTube channel
+- url: The exact YouTube URL for the podcast/channel
+
+If any field cannot be determined, use an empty string.
+"""
+
+TRANSCRIPTION_PROMPT = """
+Given podcast transcription: '{}', find YouTube link/channel and return the response in JSON format with the following fields:
+- title: The title of the YouTube video
+- channel: The name of the YouTube channel
+- channelLink: The link to the YouTube channel
+- url: The direct URL to the YouTube video
+
+If any field cannot be determined, use an empty string.
+"""
+
+# Running totals for the progressive transcription log line
+_progressive_stats = {"previews": 0, "escalated": 0}
+_progressive_stats_lock = threading.Lock()
+
+def _search_transcription(post, video_path):
+    """
+    Transcribe a video and look up its YouTube source.
+
+    In progressive mode only the leading window of speech is transcribed
+    first. The rest of the audio is transcribed only when the lookup on that
+    window doesn't return a YouTube link, and is then looked up together
+    with the preview.
+
+    Returns:
+        dict: Perplexity search result
+    """
+    if TRANSCRIPTION_PROGRESSIVE:
+        transcript, covers_whole = transcribe_video_preview(video_path)
+        if transcript is not None:
+            result = perplexity_search(transcript, TRANSCRIPTION_PROMPT, response_schema=VIDEO_INFO_SCHEMA)
+            escalate = not covers_whole and not has_youtube_video_link(result.get('raw_response'))
+
+            with _progressive_stats_lock:
+                _progressive_stats["previews"] += 1
+                if escalate:
+                    _progressive_stats["escalated"] += 1
+                stats = dict(_progressive_stats)
+            logger.info(f"Progressive transcription for post {post['id']}: "
+                        f"{'escalating to full audio' if escalate else 'preview was enough'} "
+                        f"(escalation rate {stats['escalated']}/{stats['previews']})")
+            if not escalate:
+                return result
+
+            remainder = transcribe_video_remainder(video_path)
+            if remainder is not None:
+                return perplexity_search(f"{transcript} {remainder}".strip(), TRANSCRIPTION_PROMPT,
+                                         response_schema=VIDEO_INFO_SCHEMA)
+
+    transcript = transcribe_video(video_path)
+    return perplexity_search(transcript, TRANSCRIPTION_PROMPT, response_schema=VIDEO_INFO_SCHEMA)
+
+def _search_result(post, result):
+    """
+    Build the result entry for a Perplexity search.
+
+    Schema-valid structured output is used as is; anything else is left for
+    GPT formatting.
+    """
+    if 'structured' in result:
+        return {
+            "post_id": post['id'],
+            "raw_response": result['structured']
+        }
+    return {
+        "post_id": post['id'],
+        "unformatted": result
+    }
+
+def _analyze_post(post, method):
+    """
+    Analyze a single post using the specified method.
+
+    Args:
+        post (dict): Post to analyze
+        method (str): Analysis method to use (Caption/Transcription/Gemini)
+
+    Returns:
+        dict: Analysis result for the post, or None if the method does not apply.
+            Results still to be formatted carry the API result under `unformatted`
+            instead of `raw_response`.
+    """
+    if method == "Caption":
+        logger.debug(f"Analyzing caption for post {post['id']}")
+        result = perplexity_search(
+            post.get('caption', ''),
+            CAPTION_PROMPT,
+            response_schema=VIDEO_INFO_SCHEMA
+        )
+
+        return _caption_result(post, result)
+
+    if method == "Transcription" and post.get('videoUrl'):
+        with shared_downloads.video(post['videoUrl']) as (video_path, error):
+            if error:
+                return {
+                    "post_id": post['id'],
+                    "raw_response": {"error": error}
+                }
+
+            result = _search_transcription(post, video_path)
+        return _search_result(post, result)
+
+    if method == "Gemini" and post.get('videoUrl'):
+        with shared_downloads.video(post['videoUrl']) as (video_path, error):
+            if error:
+                return {
+                    "post_id": post['id'],
+                    "raw_response": {"error": error}
+                }
+
+            result = gemini_process_video(video_path)
+        return {
+            "post_id": post['id'],
+            "unformatted": result
+        }
+
+    return None
+
+def _caption_result(post, result):
+    """Build the result entry for a caption search."""
+    if 'raw_response' in result:
+        return _search_result(post, result)
+    return {
+        "post_id": post['id'],
+        "raw_response": {"error": "No valid response"}
+    }
+
+def _analyze_captions(posts):
+    """
+    Analyze the captions of many posts with batched Perplexity requests.
+
+    Args:
+        posts (list): Posts to analyze
+
+    Returns:
+        list: Analysis results in post order
+    """
+    try:
+        results = perplexity_search_batch(
+            {post['id']: post.get('caption', '') for post in posts},
+            CAPTION_BATCH_PROMPT,
+            CAPTION_PROMPT,
+            VIDEO_INFO_SCHEMA
+        )
+    except Exception as e:
+        return [_error_result(post, f"Error processing post {post['id']}: {str(e)}") for post in posts]
+
+    return [_caption_result(post, results[post['id']]) for post in posts]
+
+def _format_results(results):
+    """
+    Format the API results of finished posts with as few GPT requests as possible.
+
+    Args:
+        results (list): Result entries, some carrying an `unformatted` API result
+
+    Returns:
+        list: Result entries with every `unformatted` result replaced by its formatted `raw_response`
+    """
+    unformatted = {index: str(result["unformatted"]) for index, result in enumerate(results) if "unformatted" in result}
+    if not unformatted:
+        return results
+
+    try:
+        formatted = openai_service.format_json_responses(unformatted)
+    except Exception as e:
+        error_msg = f"Error formatting analysis results: {str(e)}"
+        logger.error(error_msg)
+        formatted = {index: {"error": error_msg} for index in unformatted}
+
+    return [
+        {"post_id": result["post_id"], "raw_response": formatted[index]} if index in unformatted else result
+        for index, result in enumerate(results)
+    ]
+
+def _error_result(post, error_msg):
+    """Build the result entry for a post whose analysis failed."""
+    logger.error(error_msg)
+    return {
+        "post_id": post['id'],
+        "raw_response": {
+            "error": error_msg
+        }
+    }
+
+def _timeout_result(post, timeout):
+    """Build the result entry for a post that did not finish before the deadline."""
+    return _error_result(post, f"Error processing post {post['id']}: timed out after {timeout} seconds")
+
+def _analyze_captions_before(posts, timeout):
+    """
+    Run `_analyze_captions` with a deadline.
+
+    Returns:
+        list: Analysis results in post order, or timeout errors for all posts
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+    try:
+        future = executor.submit(_analyze_captions, posts)
+        wait([future], timeout=timeout)
+    finally:
+        # Don't block on a batch that is still running past the deadline
+        executor.shutdown(wait=False)
+
+    if not future.done():
+        return [_timeout_result(post, timeout) for post in posts]
+    return future.result()
+
+def analyze_selected_posts(posts, selected_ids, method, max_workers=ANALYSIS_MAX_WORKERS, timeout=ANALYSIS_BATCH_TIMEOUT):
     """
     Analyze selected posts using the specified method.
-    
+
+    Posts are analyzed concurrently on a bounded thread pool. Results keep the
+    order of the selected posts in `posts`, and a post that fails or does not
+    finish within `timeout` gets an error entry instead of holding up the batch.
+    The raw results are formatted together once all posts have finished.
+    Captions are resolved in batched requests when caption batching is
+    enabled, under the same deadline.
+
     Args:
         posts (list): List of all posts
         selected_ids (list): List of selected post IDs
         method (str): Analysis method to use (Caption/Transcription/Gemini)
-        
+        max_workers (int): Maximum number of posts analyzed at the same time
+        timeout (float): Seconds to wait for the whole batch before giving up on unfinished posts
+
     Returns:
         list: Analysis results for each selected post
     """
+    selected_posts = [post for post in posts if post['id'] in selected_ids]
+    if not selected_posts:
+        return []
+
+    if method == "Caption" and CAPTION_BATCH_ENABLED:
+        logger.info(f"Analyzing {len(selected_posts)} posts with method {method} in batches")
+        return _format_results(_analyze_captions_before(selected_posts, timeout))
+
+    workers = max(1, min(max_workers, len(selected_posts)))
+    logger.info(f"Analyzing {len(selected_posts)} posts with method {method} using {workers} workers")
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+    try:
+        futures = [executor.submit(_analyze_post, post, method) for post in selected_posts]
+        wait(futures, timeout=timeout)
+    finally:
+        # Don't block on posts that are still running past the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
     results = []
-    
-    for post in posts:
-        if post['id'] in selected_ids:
-            try:
-                if method == "Caption":
-                    logger.debug(f"Analyzing caption for post {post['id']}")
-                    prompt = """
-                    From this Instagram caption: '{}', find the exact YouTube podcast/channel and return the response in JSON format with the following fields: title, channel, channel link, the exact youtube url for the podcast/channel, we want full video of the podcast. 
-                    """
-                    result = perplexity_search(
-                        post.get('caption', ''),
-                        prompt
-                    )
-                    
-                    if 'raw_response' in result:
-                        # Format the response using GPT
-                        formatted_info = openai_service.format_json_response(str(result))
-                        results.append({
-                            "post_id": post['id'],
-                            "raw_response": formatted_info
-                        })
-                    else:
-                        results.append({
-                            "post_id": post['id'],
-                            "raw_response": {"error": "No valid response"}
-                        })
-                
-                elif method == "Transcription" and post.get('videoUrl'):
-                    video_path, error = download_video(post['videoUrl'])
-                    if error:
-                        results.append({
-                            "post_id": post['id'],
-                            "raw_response": {"error": error}
-                        })
-                        continue
-                        
-                    try:
-                        transcript = openai_service.transcribe_audio(video_path)
-                        prompt = """
-                        Given podcast transcription: '{}', find YouTube link/channel and return the response in JSON format with the following fields:
-                        - title: The title of the YouTube video
-                        - channel: The name of the YouTube channel
-                        - channelLink: The link to the YouTube channel
-                        - url: The direct URL to the YouTube video
-                        
-                        If any field cannot be determined, use an empty string.
-                        """
-                        result = perplexity_search(transcript, prompt)
-                        formatted_info = openai_service.format_json_response(str(result))
-                        results.append({
-                            "post_id": post['id'],
-                            "raw_response": formatted_info
-                        })
-                    finally:
-                        if os.path.exists(video_path):
-                            os.unlink(video_path)
-                
-                elif method == "Gemini" and post.get('videoUrl'):
-                    video_path, error = download_video(post['videoUrl'])
-                    if error:
-                        results.append({
-                            "post_id": post['id'],
-                            "raw_response": {"error": error}
-                        })
-                        continue
-                        
-                    try:
-                        result = gemini_process_video(video_path)
-                        formatted_info = openai_service.format_json_response(str(result))
-                        results.append({
-                            "post_id": post['id'],
-                            "raw_response": formatted_info
-                        })
-                    finally:
-                        if os.path.exists(video_path):
-                            os.unlink(video_path)
-                
-            except Exception as e:
-                error_msg = f"Error processing post {post['id']}: {str(e)}"
-                logger.error(error_msg)
-                results.append({
-                    "post_id": post['id'],
-                    "raw_response": {
-                        "error": error_msg
-                    }
-                })
-    
-    return results 
\ No newline at end of file
+    for post, future in zip(selected_posts, futures):
+        # Posts still queued at the deadline were cancelled by the shutdown above
+        if not future.done() or future.cancelled():
+            future.cancel()
+            results.append(_timeout_result(post, timeout))
+            continue
+
+        try:
+            result = future.result()
+        except Exception as e:
+            results.append(_error_result(post, f"Error processing post {post['id']}: {str(e)}"))
+            continue
+
+        if result is not None:
+            results.append(result)
+
+    return _format_results(results)
@@ -0,0 +1,258 @@
+import bisect
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from src.config.settings import (
+    FFMPEG_BINARY, FFMPEG_TIMEOUT, AUDIO_CACHE_DIR, AUDIO_BITRATE, AUDIO_SAMPLE_RATE, VIDEO_CACHE_ENABLED,
+    SILENCE_NOISE_DB, SILENCE_MIN_SECONDS, TRIM_MIN_SILENCE_SECONDS, TRIM_PADDING_SECONDS
+)
+from src.utils.hashing import file_sha256
+
+logger = logging.getLogger(__name__)
+
+AUDIO_SUFFIX = ".mp3"
+
+DURATION_PATTERN = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+SILENCE_START_PATTERN = re.compile(r"silence_start:\s*(-?\d+(?:\.\d+)?)")
+SILENCE_END_PATTERN = re.compile(r"silence_end:\s*(-?\d+(?:\.\d+)?)")
+
+def ffmpeg_available():
+    """Check whether the ffmpeg binary can be found."""
+    return shutil.which(FFMPEG_BINARY) is not None
+
+def run_ffmpeg(args, timeout=FFMPEG_TIMEOUT):
+    """
+    Run ffmpeg with the given arguments.
+
+    Returns:
+        subprocess.CompletedProcess: Finished process with captured stderr
+
+    Raises:
+        RuntimeError: If ffmpeg exits with an error
+    """
+    command = [FFMPEG_BINARY, "-nostdin", "-hide_banner", *args]
+    process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {process.stderr.strip()[-500:]}")
+    return process
+
+def extract_audio(video_path, output_path):
+    """
+    Extract a compact mono audio track from a video.
+
+    Args:
+        video_path (str): Path to the video file
+        output_path (str): Where to write the audio file
+
+    Returns:
+        tuple: (audio_path, error_message)
+    """
+    if not ffmpeg_available():
+        return None, f"{FFMPEG_BINARY} not available"
+
+    # Unique per call, so threads extracting the same video don't write the same file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix=AUDIO_SUFFIX)
+    os.close(fd)
+    try:
+        run_ffmpeg([
+            "-y", "-loglevel", "error",
+            "-i", video_path,
+            "-vn", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE),
+            "-c:a", "libmp3lame", "-b:a", AUDIO_BITRATE,
+            tmp_path
+        ])
+        os.replace(tmp_path, output_path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        error_msg = f"Audio extraction failed: {str(e)}"
+        logger.error(error_msg)
+        return None, error_msg
+
+    video_mb = os.path.getsize(video_path) / (1024 * 1024)
+    audio_mb = os.path.getsize(output_path) / (1024 * 1024)
+    logger.info(f"Extracted audio track: {video_mb:.1f}MB video -> {audio_mb:.2f}MB audio")
+    return output_path, None
+
+@contextmanager
+def audio_track(video_path, cache_dir=AUDIO_CACHE_DIR, use_cache=VIDEO_CACHE_ENABLED):
+    """
+    Provide the audio track of a video, extracting it if needed.
+
+    With caching, the track is stored in `cache_dir` under the video's content
+    hash and reused by later calls. Otherwise it is written to a temporary file
+    that is removed on exit. When extraction is not possible the video itself
+    is yielded, since Whisper accepts video containers too.
+
+    Yields:
+        str: Path to the audio track, or to the video as a fallback
+    """
+    if not ffmpeg_available():
+        logger.warning(f"{FFMPEG_BINARY} not available, using full video for transcription")
+        yield video_path
+        return
+
+    temp_path = None
+    try:
+        if use_cache:
+            os.makedirs(cache_dir, exist_ok=True)
+            audio_path = os.path.join(cache_dir, f"{file_sha256(video_path)}{AUDIO_SUFFIX}")
+            if os.path.exists(audio_path):
+                logger.info(f"Audio cache hit for {audio_path}")
+                yield audio_path
+                return
+        else:
+            fd, temp_path = tempfile.mkstemp(suffix=AUDIO_SUFFIX)
+            os.close(fd)
+            audio_path = temp_path
+
+        extracted_path, error = extract_audio(video_path, audio_path)
+        if error:
+            logger.warning(f"Using full video for transcription: {error}")
+            yield video_path
+        else:
+            yield extracted_path
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+def _parse_duration(output, path):
+    duration_match = DURATION_PATTERN.search(output)
+    if not duration_match:
+        raise RuntimeError(f"Could not determine duration of {path}")
+    hours, minutes, seconds = duration_match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def probe_duration(audio_path):
+    """Read the duration of a media file in seconds from its header."""
+    process = run_ffmpeg(["-i", audio_path, "-t", "0", "-f", "null", "-"])
+    return _parse_duration(process.stderr, audio_path)
+
+def analyze_silence(audio_path, noise_db=SILENCE_NOISE_DB, min_duration=SILENCE_MIN_SECONDS):
+    """
+    Find the duration of an audio file and its silent spans.
+
+    Uses ffmpeg's silencedetect filter, which reports every span quieter than
+    `noise_db` lasting at least `min_duration` seconds.
+
+    Returns:
+        tuple: (duration_seconds, [(silence_start, silence_end), ...])
+    """
+    process = run_ffmpeg([
+        "-i", audio_path,
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_duration}",
+        "-f", "null", "-"
+    ])
+    output = process.stderr
+    duration = _parse_duration(output, audio_path)
+
+    starts = [max(0.0, float(value)) for value in SILENCE_START_PATTERN.findall(output)]
+    ends = [float(value) for value in SILENCE_END_PATTERN.findall(output)]
+    # A silence running to the end of the file has no silence_end line
+    ends += [duration] * (len(starts) - len(ends))
+    silences = [(start, min(end, duration)) for start, end in zip(starts, ends)]
+
+    return duration, silences
+
+def plan_segments(duration, silences, max_segment_seconds):
+    """
+    Split a timeline into segments no longer than `max_segment_seconds`.
+
+    Each cut is placed in the middle of the latest silence in the second half
+    of the allowed window, so words are not split across segments. When there
+    is no such silence the segment is cut at the limit.
+
+    Returns:
+        list: [(start, end), ...] covering the whole duration in order
+    """
+    segments = []
+    start = 0.0
+    while duration - start > max_segment_seconds:
+        limit = start + max_segment_seconds
+        earliest = start + max_segment_seconds / 2
+        candidates = [(silence_start + silence_end) / 2 for silence_start, silence_end in silences]
+        candidates = [point for point in candidates if earliest < point <= limit]
+        cut = max(candidates) if candidates else limit
+        segments.append((start, cut))
+        start = cut
+    segments.append((start, duration))
+    return segments
+
+def cut_audio(audio_path, start, end, output_path):
+    """Copy the [start, end) span of an audio file into `output_path`."""
+    run_ffmpeg([
+        "-y", "-loglevel", "error",
+        "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}",
+        "-i", audio_path,
+        "-c", "copy",
+        output_path
+    ])
+    return output_path
+
+def speech_spans(duration, silences, min_silence=TRIM_MIN_SILENCE_SECONDS, padding=TRIM_PADDING_SECONDS):
+    """
+    Compute the spans left after removing long silences.
+
+    Silences shorter than `min_silence` are kept as natural pauses, and
+    `padding` seconds are kept on each side of a removed silence so speech
+    onsets are not clipped.
+
+    Returns:
+        list: [(start, end), ...] of audio to keep, in order
+    """
+    spans = []
+    cursor = 0.0
+    for silence_start, silence_end in silences:
+        if silence_end - silence_start < min_silence:
+            continue
+        cut_start = silence_start + padding if silence_start > 0 else 0.0
+        cut_end = silence_end - padding if silence_end < duration else duration
+        if cut_end <= cut_start:
+            continue
+        if cut_start > cursor:
+            spans.append((cursor, cut_start))
+        cursor = max(cursor, cut_end)
+    if cursor < duration:
+        spans.append((cursor, duration))
+    return spans
+
+class TimestampMap:
+    """Maps times in trimmed audio back to times in the original audio."""
+
+    def __init__(self, spans):
+        """
+        Args:
+            spans (list): [(start, end), ...] of original audio kept in the trimmed file
+        """
+        self._trimmed_starts = []
+        self._spans = []
+        trimmed = 0.0
+        for start, end in spans:
+            self._trimmed_starts.append(trimmed)
+            self._spans.append((start, end))
+            trimmed += end - start
+        self.duration = trimmed
+
+    def to_original(self, seconds):
+        """Convert a time in the trimmed audio to the original timeline."""
+        if not self._spans:
+            return seconds
+        index = max(0, bisect.bisect_right(self._trimmed_starts, seconds) - 1)
+        start, end = self._spans[index]
+        return min(start + seconds - self._trimmed_starts[index], end)
+
+def trim_audio(audio_path, spans, output_path):
+    """Write only the given spans of an audio file, back to back, into `output_path`."""
+    selection = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in spans)
+    run_ffmpeg([
+        "-y", "-loglevel", "error",
+        "-i", audio_path,
+        "-af", f"aselect='{selection}',asetpts=N/SR/TB",
+        "-c:a", "libmp3lame", "-b:a", AUDIO_BITRATE,
+        output_path
+    ])
+    return output_path
@@ -155,10 +155,59 @@ Remember to be specific about why the results are or aren't satisfactory."""
                 "suggested_queries": []
             }
     
+    def refine(self, query: str, initial_results: list, evaluation: dict, max_results: int = 10) -> list:
+        """
+        Refine existing search results using an existing evaluation.
+        
+        Only the alternative queries suggested by the evaluation are searched,
+        so callers that already ran the initial search and evaluation don't
+        pay for them twice.
+        
+        Args:
+            query (str): The original search query
+            initial_results (list): Results of the original search
+            evaluation (dict): Evaluation of `initial_results`, see `evaluate_results`
+            max_results (int): Maximum number of results to return
+            
+        Returns:
+            list: Refined results, or `initial_results` if refinement found nothing
+        """
+        # If satisfied with initial results, return them
+        if evaluation["satisfied"]:
+            logger.info(f"Satisfied with initial results for query: {query}")
+            return initial_results
+        
+        # If not satisfied and we have suggested queries, try them
+        if not evaluation["suggested_queries"]:
+            return initial_results
+        
+        logger.info(f"Trying alternative queries: {evaluation['suggested_queries']}")
+        
+        # Run all alternative queries in one actor run
+        results_by_query = apify_service.search_youtube_podcasts_multi(
+            evaluation["suggested_queries"], max_results
+        )
+        all_results = [result for results in results_by_query.values() for result in results]
+        
+        if not all_results:
+            logger.warning("No results found with alternative queries")
+            return initial_results
+        
+        # Remove duplicates based on video ID
+        seen_ids = set()
+        unique_results = []
+        for result in all_results:
+            if result.get('id') not in seen_ids:
+                seen_ids.add(result.get('id'))
+                unique_results.append(result)
+        
+        # Return top results up to max_results
+        return unique_results[:max_results]
+    
     def search(self, query: str, max_results: int = 10) -> list:
         """
         Perform an agent-based search for YouTube podcasts.
-        First tries normal search, then refines if needed.
+        First tries normal search, then refines if needed, see `refine`.
         
         Args:
             query (str): The search query
@@ -177,42 +226,7 @@ Remember to be specific about why the results are or aren't satisfactory."""
             # Evaluate the results
             evaluation = self.evaluate_results(query, initial_results)
             
-            # If satisfied with initial results, return them
-            if evaluation["satisfied"]:
-                logger.info(f"Satisfied with initial results for query: {query}")
-                return initial_results
-            
-            # If not satisfied and we have suggested queries, try them
-            if evaluation["suggested_queries"]:
-                logger.info(f"Trying alternative queries: {evaluation['suggested_queries']}")
-                
-                # Collect all results from different queries
-                all_results = []
-                for alt_query in evaluation["suggested_queries"]:
-                    try:
-                        results = apify_service.search_youtube_podcasts(alt_query, max_results)
-                        if results:
-                            all_results.extend(results)
-                    except Exception as e:
-                        logger.error(f"Error searching with query '{alt_query}': {str(e)}")
-                
-                if all_results:
-                    # Remove duplicates based on video ID
-                    seen_ids = set()
-                    unique_results = []
-                    for result in all_results:
-                        if result.get('id') not in seen_ids:
-                            seen_ids.add(result.get('id'))
-                            unique_results.append(result)
-                    
-                    # Return top results up to max_results
-                    return unique_results[:max_results]
-                else:
-                    logger.warning("No results found with alternative queries")
-                    return initial_results
-            
-            # If no suggested queries, return initial results
-            return initial_results
+            return self.refine(query, initial_results, evaluation, max_results)
             
         except Exception as e:
             logger.error(f"Search failed: {str(e)}")
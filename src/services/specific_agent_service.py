@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.schema.messages import SystemMessage, HumanMessage
@@ -6,6 +7,7 @@ from langchain.tools import Tool
 from langchain_openai import ChatOpenAI
 from src.api.apify_client import apify_service
 from src.services.analysis_service import analyze_selected_posts
+from src.services.video_service import shared_downloads
 from src.config.settings import OPENAI_API_KEY
 
 logger = logging.getLogger(__name__)
@@ -82,6 +84,17 @@ def create_analysis_tool(method: str):
         func=analyze_posts
     )
 
+def _merge_tool_results(post_analyses: dict, tool_results: str, analysis_key: str):
+    """Map the string output of an analysis tool into post_analyses by post ID."""
+    if tool_results.startswith('[') and tool_results.endswith(']'):
+        parsed_results = eval(tool_results)
+        for result in parsed_results or []:
+            post_id = result.get('post_id')
+            if post_id:
+                if post_id not in post_analyses:
+                    post_analyses[post_id] = {'caption_analysis': None, 'transcription_analysis': None, 'gemini_analysis': None}
+                post_analyses[post_id][analysis_key] = result
+
 class SpecificAgentService:
     def __init__(self):
         # LLM for evaluation with JSON response format
@@ -286,66 +299,33 @@ Remember to be specific about why the posts are or aren't satisfactory for podca
                     # Create a structured result for each post
                     post_analyses = {}
                     
-                    # First analyze captions for all posts
-                    logger.info(f"Analyzing captions for {len(selected_posts)} posts")
-                    caption_tool = next((t for t in self.tools if t.name == "analyze_caption"), None)
-                    if caption_tool:
-                        caption_results = caption_tool.func(selected_ids=post_ids, all_posts=all_posts)
-                        try:
-                            if caption_results.startswith('[') and caption_results.endswith(']'):
-                                parsed_results = eval(caption_results)
-                                if parsed_results:
-                                    # Map caption results to posts by ID
-                                    for result in parsed_results:
-                                        post_id = result.get('post_id')
-                                        if post_id:
-                                            if post_id not in post_analyses:
-                                                post_analyses[post_id] = {'caption_analysis': None, 'transcription_analysis': None, 'gemini_analysis': None}
-                                            post_analyses[post_id]['caption_analysis'] = result
-                        except Exception as e:
-                            logger.error(f"Error parsing caption results: {str(e)}")
-                    
-                    # Then analyze videos if present
+                    # Caption, transcription and Gemini analyses are independent, so run them concurrently
+                    phases = [("analyze_caption", post_ids, 'caption_analysis', "caption")]
                     video_posts = [post for post in selected_posts if post.get('videoUrl')]
                     if video_posts:
                         logger.info(f"Analyzing {len(video_posts)} video posts")
                         video_ids = [post.get('id') for post in video_posts]
+                        phases.append(("analyze_transcription", video_ids, 'transcription_analysis', "transcription"))
+                        phases.append(("analyze_gemini", video_ids, 'gemini_analysis', "Gemini"))
+                    
+                    logger.info(f"Analyzing captions for {len(selected_posts)} posts")
+                    # The scope lets transcription and Gemini share one download per video
+                    with shared_downloads.scope(), \
+                            ThreadPoolExecutor(max_workers=len(phases), thread_name_prefix="channel-analysis") as executor:
+                        futures = {}
+                        for tool_name, ids, analysis_key, label in phases:
+                            tool = next((t for t in self.tools if t.name == tool_name), None)
+                            if tool:
+                                future = executor.submit(tool.func, selected_ids=ids, all_posts=all_posts)
+                                futures[future] = (analysis_key, label)
                         
-                        # Transcription analysis
-                        transcription_tool = next((t for t in self.tools if t.name == "analyze_transcription"), None)
-                        if transcription_tool:
-                            trans_results = transcription_tool.func(selected_ids=video_ids, all_posts=all_posts)
-                            try:
-                                if trans_results.startswith('[') and trans_results.endswith(']'):
-                                    parsed_results = eval(trans_results)
-                                    if parsed_results:
-                                        # Map transcription results to posts by ID
-                                        for result in parsed_results:
-                                            post_id = result.get('post_id')
-                                            if post_id:
-                                                if post_id not in post_analyses:
-                                                    post_analyses[post_id] = {'caption_analysis': None, 'transcription_analysis': None, 'gemini_analysis': None}
-                                                post_analyses[post_id]['transcription_analysis'] = result
-                            except Exception as e:
-                                logger.error(f"Error parsing transcription results: {str(e)}")
-                        
-                        # Gemini analysis
-                        gemini_tool = next((t for t in self.tools if t.name == "analyze_gemini"), None)
-                        if gemini_tool:
-                            gemini_results = gemini_tool.func(selected_ids=video_ids, all_posts=all_posts)
+                        # Merge each phase into post_analyses as soon as it finishes
+                        for future in as_completed(futures):
+                            analysis_key, label = futures[future]
                             try:
-                                if gemini_results.startswith('[') and gemini_results.endswith(']'):
-                                    parsed_results = eval(gemini_results)
-                                    if parsed_results:
-                                        # Map Gemini results to posts by ID
-                                        for result in parsed_results:
-                                            post_id = result.get('post_id')
-                                            if post_id:
-                                                if post_id not in post_analyses:
-                                                    post_analyses[post_id] = {'caption_analysis': None, 'transcription_analysis': None, 'gemini_analysis': None}
-                                                post_analyses[post_id]['gemini_analysis'] = result
+                                _merge_tool_results(post_analyses, future.result(), analysis_key)
                             except Exception as e:
-                                logger.error(f"Error parsing Gemini results: {str(e)}")
+                                logger.error(f"Error parsing {label} results: {str(e)}")
                     
                     # Create the final combined results with post details
                     for post in selected_posts:
@@ -0,0 +1,277 @@
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.api.openai_client import openai_service
+from src.services.audio_service import (
+    audio_track, analyze_silence, plan_segments, cut_audio, speech_spans, trim_audio, TimestampMap
+)
+from src.config.settings import (
+    TRANSCRIPTION_SEGMENT_SECONDS, TRANSCRIPTION_MAX_WORKERS, TRANSCRIPTION_TRIM_SILENCE, TRIM_MIN_SILENCE_SECONDS,
+    TRANSCRIPTION_PREVIEW_SECONDS,
+    WHISPER_MODEL, TRANSCRIPT_CACHE_ENABLED, TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_TTL_HOURS, TRANSCRIPT_CACHE_MAX_ENTRIES
+)
+from src.utils.hashing import file_sha256
+from src.utils.json_cache import JsonDirectoryCache
+
+logger = logging.getLogger(__name__)
+
+# Transcripts keyed by Whisper model and audio content hash
+transcript_cache = JsonDirectoryCache(
+    TRANSCRIPT_CACHE_DIR,
+    ttl=TRANSCRIPT_CACHE_TTL_HOURS * 3600,
+    max_entries=TRANSCRIPT_CACHE_MAX_ENTRIES
+) if TRANSCRIPT_CACHE_ENABLED else None
+
+# Running totals for the silence trimming log line
+_trim_stats = {"clips": 0, "trimmed": 0, "seconds_saved": 0.0}
+_trim_stats_lock = threading.Lock()
+
+def _transcribe_segment(audio_path, start, end, work_dir, index):
+    """Cut one segment out of the audio and transcribe it."""
+    segment_path = cut_audio(audio_path, start, end, os.path.join(work_dir, f"segment{index:04d}.mp3"))
+    return openai_service.transcribe_audio(segment_path, raise_on_error=True)
+
+def _trim_silence(audio_path, duration, silences, work_dir):
+    """
+    Remove long silences before transcription.
+
+    Returns:
+        tuple: (audio_path, TimestampMap) for the trimmed audio, or (audio_path, None) if nothing was trimmed
+    """
+    spans = speech_spans(duration, silences)
+    timestamp_map = TimestampMap(spans)
+    saved = duration - timestamp_map.duration
+    trimmed = bool(spans) and saved >= TRIM_MIN_SILENCE_SECONDS
+
+    with _trim_stats_lock:
+        _trim_stats["clips"] += 1
+        if trimmed:
+            _trim_stats["trimmed"] += 1
+            _trim_stats["seconds_saved"] += saved
+        stats = dict(_trim_stats)
+
+    logger.info(f"Silence trimming removed {saved if trimmed else 0:.1f}s of {duration:.1f}s "
+                f"(hit rate {stats['trimmed']}/{stats['clips']} clips, {stats['seconds_saved']:.1f}s saved in total)")
+    if not trimmed:
+        return audio_path, None
+
+    trimmed_path = trim_audio(audio_path, spans, os.path.join(work_dir, "trimmed.mp3"))
+    return trimmed_path, timestamp_map
+
+def _speech_audio(audio_path, work_dir, trim_silence):
+    """
+    Analyze an audio file and optionally trim its long silences.
+
+    Returns:
+        tuple: (audio_path, TimestampMap or None, duration, silences) of the audio to transcribe
+    """
+    duration, silences = analyze_silence(audio_path)
+
+    timestamp_map = None
+    if trim_silence:
+        audio_path, timestamp_map = _trim_silence(audio_path, duration, silences, work_dir)
+        if timestamp_map:
+            duration, silences = analyze_silence(audio_path)
+    return audio_path, timestamp_map, duration, silences
+
+def transcribe_segments(audio_path, max_segment_seconds=TRANSCRIPTION_SEGMENT_SECONDS, max_workers=TRANSCRIPTION_MAX_WORKERS,
+                        trim_silence=TRANSCRIPTION_TRIM_SILENCE, offset=0.0):
+    """
+    Transcribe an audio file, splitting long audio on silences.
+
+    Long silences are optionally trimmed first. Audio longer than
+    `max_segment_seconds` is then cut at silence boundaries and the segments
+    are transcribed concurrently on a bounded pool, so latency is close to
+    that of the longest segment.
+
+    Args:
+        audio_path (str): Path to the audio file
+        max_segment_seconds (int): Longest segment sent to Whisper in one request
+        max_workers (int): Maximum number of concurrent Whisper requests
+        trim_silence (bool): Remove long silences before transcribing
+        offset (float): Skip this many seconds of the (trimmed) audio, e.g. an already transcribed preview
+
+    Returns:
+        tuple: (segments, complete), where segments is
+            [{"start": seconds, "end": seconds, "text": str}, ...] in timeline order,
+            with times on the original (untrimmed) timeline, and complete is False
+            when failed segments were left out
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        audio_path, timestamp_map, duration, silences = _speech_audio(audio_path, work_dir, trim_silence)
+
+        if offset >= duration:
+            return [], True
+        if offset > 0:
+            audio_path = cut_audio(audio_path, offset, duration, os.path.join(work_dir, "remainder.mp3"))
+            silences = [(max(0.0, silence_start - offset), silence_end - offset)
+                        for silence_start, silence_end in silences if silence_end > offset]
+            duration -= offset
+
+        segments = plan_segments(duration, silences, max_segment_seconds)
+        if len(segments) == 1:
+            texts = [openai_service.transcribe_audio(audio_path, raise_on_error=True)]
+        else:
+            logger.info(f"Transcribing {duration:.0f}s of audio in {len(segments)} segments")
+            workers = max(1, min(max_workers, len(segments)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcription") as executor:
+                futures = [
+                    executor.submit(_transcribe_segment, audio_path, start, end, work_dir, index)
+                    for index, (start, end) in enumerate(segments)
+                ]
+                texts = []
+                for (start, end), future in zip(segments, futures):
+                    try:
+                        texts.append(future.result())
+                    except Exception as e:
+                        texts.append(None)
+                        logger.error(f"Segment {start:.0f}-{end:.0f}s failed: {str(e)}")
+
+    if all(text is None for text in texts):
+        raise RuntimeError("All transcription segments failed")
+
+    to_trimmed = lambda seconds: seconds + offset
+    to_original = (lambda seconds: timestamp_map.to_original(to_trimmed(seconds))) if timestamp_map else to_trimmed
+    return [
+        {"start": to_original(start), "end": to_original(end), "text": text}
+        for (start, end), text in zip(segments, texts)
+        if text is not None
+    ], all(text is not None for text in texts)
+
+def _transcribe_audio(audio_path, is_video, offset=0.0):
+    """
+    Transcribe an audio track, or a whole video when no track could be extracted.
+
+    `offset` skips the leading seconds of the trimmed audio track, see `transcribe_segments`.
+
+    Returns:
+        tuple: (transcribed text, complete), see `transcribe_segments`
+
+    Raises:
+        Exception: If transcription fails
+    """
+    if is_video:
+        # No ffmpeg, so the file can't be split either
+        return openai_service.transcribe_audio(audio_path, raise_on_error=True), True
+
+    segments, complete = transcribe_segments(audio_path, offset=offset)
+    return " ".join(segment["text"].strip() for segment in segments if segment["text"]), complete
+
+def transcribe_video(video_path):
+    """
+    Transcribe the speech in a video.
+
+    Extracts the audio track when ffmpeg is available and transcribes it in
+    segments; otherwise sends the file to Whisper as a whole. Transcripts are
+    cached by audio content hash and Whisper model, so the same audio is only
+    transcribed once.
+
+    Args:
+        video_path (str): Path to the video file
+
+    Returns:
+        str: Transcribed text or error message
+    """
+    with audio_track(video_path) as audio_path:
+        cache_key = None
+        if transcript_cache is not None:
+            cache_key = f"{WHISPER_MODEL}:{file_sha256(audio_path)}"
+            transcript = transcript_cache.get(cache_key)
+            if transcript is not None:
+                logger.info(f"Transcript cache hit for {cache_key}")
+                return transcript
+
+        try:
+            transcript, complete = _transcribe_audio(audio_path, is_video=audio_path == video_path)
+        except Exception as e:
+            error_msg = f"Transcription failed: {str(e)}"
+            logger.error(error_msg)
+            return error_msg
+
+    if cache_key and complete:
+        transcript_cache.set(cache_key, transcript)
+    return transcript
+
+def _preview_cache_key(audio_path, seconds, part):
+    trimmed = ":trimmed" if TRANSCRIPTION_TRIM_SILENCE else ""
+    return f"{WHISPER_MODEL}:{file_sha256(audio_path)}:{part}{seconds}s{trimmed}"
+
+def transcribe_video_preview(video_path, seconds=TRANSCRIPTION_PREVIEW_SECONDS):
+    """
+    Transcribe only the first `seconds` of speech in a video.
+
+    Podcast clips usually name the show or guest early on, so a short
+    leading window is often enough to identify the source. The window is
+    taken after silence trimming, so a silent intro doesn't use it up.
+    See `transcribe_video_remainder` for the rest of the audio.
+
+    Args:
+        video_path (str): Path to the video file
+        seconds (int): Length of the leading window
+
+    Returns:
+        tuple: (transcript, covers_whole_video), or (None, False) when a preview
+            is not possible and the full video should be transcribed instead
+    """
+    with audio_track(video_path) as audio_path:
+        if audio_path == video_path:
+            # Without ffmpeg the audio can't be cut
+            return None, False
+
+        cache_key = None
+        try:
+            if transcript_cache is not None:
+                cache_key = _preview_cache_key(audio_path, seconds, "preview")
+                cached = transcript_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Transcript cache hit for {cache_key}")
+                    return cached["text"], cached["covers_whole"]
+
+            with tempfile.TemporaryDirectory() as work_dir:
+                speech_path, _, duration, _ = _speech_audio(audio_path, work_dir, TRANSCRIPTION_TRIM_SILENCE)
+                covers_whole = duration <= seconds
+                if not covers_whole:
+                    speech_path = cut_audio(speech_path, 0.0, float(seconds), os.path.join(work_dir, "preview.mp3"))
+                transcript = openai_service.transcribe_audio(speech_path, raise_on_error=True)
+        except Exception as e:
+            logger.warning(f"Preview transcription failed, falling back to full transcription: {str(e)}")
+            return None, False
+
+    if cache_key:
+        transcript_cache.set(cache_key, {"text": transcript, "covers_whole": covers_whole})
+    return transcript, covers_whole
+
+def transcribe_video_remainder(video_path, seconds=TRANSCRIPTION_PREVIEW_SECONDS):
+    """
+    Transcribe the speech after the window covered by `transcribe_video_preview`.
+
+    Args:
+        video_path (str): Path to the video file
+        seconds (int): Length of the leading window that was already transcribed
+
+    Returns:
+        str: Transcribed text, or None on failure
+    """
+    with audio_track(video_path) as audio_path:
+        if audio_path == video_path:
+            return None
+
+        cache_key = None
+        try:
+            if transcript_cache is not None:
+                cache_key = _preview_cache_key(audio_path, seconds, "after")
+                transcript = transcript_cache.get(cache_key)
+                if transcript is not None:
+                    logger.info(f"Transcript cache hit for {cache_key}")
+                    return transcript
+
+            transcript, complete = _transcribe_audio(audio_path, is_video=False, offset=float(seconds))
+        except Exception as e:
+            logger.warning(f"Remainder transcription failed: {str(e)}")
+            return None
+
+    if cache_key and complete:
+        transcript_cache.set(cache_key, transcript)
+    return transcript
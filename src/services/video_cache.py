@@ -0,0 +1,258 @@
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from src.config.settings import VIDEO_CACHE_DIR, VIDEO_CACHE_MAX_MB, AUDIO_CACHE_DIR
+from src.utils.hashing import file_sha256, text_sha256
+
+logger = logging.getLogger(__name__)
+
+# Instagram serves the same file from many edge hosts with short-lived signed query strings
+INSTAGRAM_CDN_SUFFIXES = ("cdninstagram.com", "fbcdn.net")
+
+HASH_LENGTH = 64
+
+def _content_hash(name):
+    """Content hash a cache file is named after, or None for other files such as temporary ones."""
+    prefix = name.split(".", 1)[0]
+    if len(prefix) == HASH_LENGTH and all(c in "0123456789abcdef" for c in prefix):
+        return prefix
+    return None
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def canonical_video_url(url):
+    """
+    Normalize a video URL so the same video maps to the same cache key.
+
+    Instagram CDN URLs are reduced to their path, dropping the edge host and
+    the signature parameters that change on every fetch. Other URLs keep their
+    query string with parameters sorted.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.endswith(INSTAGRAM_CDN_SUFFIXES):
+        return f"instagram-cdn:{parts.path}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), host, parts.path, query, ""))
+
+class VideoCache:
+    """
+    Persistent, content-addressed video cache with size-bounded LRU eviction.
+
+    Videos are stored once per content hash under `blobs/`, and `urls/` maps
+    each canonical URL to the hash of the video it served. All writes go
+    through a temporary file and `os.replace`, so concurrent sessions never
+    see partially written entries. Reads refresh the blob's mtime, which
+    eviction uses as the LRU order. Files derived from a video and named
+    after its hash in `derived_dirs`, such as extracted audio, count toward
+    the byte budget and are evicted together with it. Videos in use hold a
+    lease file under `leases/`, which keeps every process sharing the cache
+    from evicting them.
+    """
+
+    def __init__(self, cache_dir=VIDEO_CACHE_DIR, max_bytes=VIDEO_CACHE_MAX_MB * 1024 * 1024, derived_dirs=()):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.derived_dirs = derived_dirs
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.url_dir = os.path.join(cache_dir, "urls")
+        self.tmp_dir = os.path.join(cache_dir, "tmp")
+        self.lease_dir = os.path.join(cache_dir, "leases")
+        self._lock = threading.Lock()
+
+    def _url_entry(self, url):
+        return os.path.join(self.url_dir, text_sha256(canonical_video_url(url)))
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.blob_dir, f"{content_hash}.mp4")
+
+    def _ensure_dirs(self):
+        for path in (self.blob_dir, self.url_dir, self.tmp_dir):
+            os.makedirs(path, exist_ok=True)
+
+    def lease(self, blob_path):
+        """
+        Mark a cached video as in use until `release_lease` is called.
+
+        Returns:
+            str: Lease file to pass to `release_lease`
+        """
+        os.makedirs(self.lease_dir, exist_ok=True)
+        content_hash = os.path.splitext(os.path.basename(blob_path))[0]
+        lease_path = os.path.join(self.lease_dir, f"{content_hash}.{os.getpid()}.{uuid.uuid4().hex}")
+        with open(lease_path, "w", encoding="utf-8"):
+            pass
+        return lease_path
+
+    def release_lease(self, lease_path):
+        """Release a lease taken with `lease`."""
+        try:
+            os.unlink(lease_path)
+        except OSError:
+            pass
+
+    def _leased(self):
+        """Content hashes leased by running processes; leases of processes that died are removed."""
+        try:
+            names = os.listdir(self.lease_dir)
+        except OSError:
+            return set()
+
+        leased = set()
+        for name in names:
+            content_hash, _, rest = name.partition(".")
+            try:
+                alive = _pid_alive(int(rest.partition(".")[0]))
+            except ValueError:
+                alive = False
+            if alive:
+                leased.add(content_hash)
+            else:
+                self.release_lease(os.path.join(self.lease_dir, name))
+        return leased
+
+    def download_dir(self):
+        """Directory for in-progress downloads, on the same filesystem as the cache."""
+        self._ensure_dirs()
+        return self.tmp_dir
+
+    def get(self, url):
+        """
+        Look up a cached video by URL.
+
+        Returns:
+            str: Path to the cached video, or None on a miss
+        """
+        try:
+            with open(self._url_entry(url), "r", encoding="utf-8") as f:
+                content_hash = f.read().strip()
+        except OSError:
+            return None
+
+        blob_path = self._blob_path(content_hash)
+        try:
+            # Mark as recently used
+            os.utime(blob_path)
+        except OSError:
+            return None
+
+        logger.info(f"Video cache hit for {canonical_video_url(url)}")
+        return blob_path
+
+    def put(self, url, file_path, keep=()):
+        """
+        Move a downloaded video into the cache and record it for the URL.
+
+        Args:
+            url (str): URL the video was downloaded from
+            file_path (str): Downloaded file, ideally inside `download_dir()`
+            keep (iterable): Cached paths that must not be evicted
+
+        Returns:
+            str: Path to the cached video
+        """
+        self._ensure_dirs()
+        content_hash = file_sha256(file_path)
+        blob_path = self._blob_path(content_hash)
+
+        if os.path.exists(blob_path):
+            # Same bytes already cached, e.g. the same reel posted by another account
+            os.unlink(file_path)
+            os.utime(blob_path)
+        else:
+            os.replace(file_path, blob_path)
+
+        fd, tmp_entry = tempfile.mkstemp(dir=self.tmp_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content_hash)
+        os.replace(tmp_entry, self._url_entry(url))
+
+        self.evict(keep=set(keep) | {blob_path})
+        return blob_path
+
+    def _usage(self):
+        """
+        Size and recency of every cached video together with its derived files.
+
+        Returns:
+            tuple: (total bytes, {content_hash: [mtime, size, blob_path or None]})
+        """
+        entries = {}
+        total = 0
+        for directory in (self.blob_dir, *self.derived_dirs):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                content_hash = _content_hash(name)
+                if content_hash is None:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entry = entries.setdefault(content_hash, [stat.st_mtime, 0, None])
+                entry[1] += stat.st_size
+                if directory == self.blob_dir:
+                    entry[0], entry[2] = stat.st_mtime, path
+                elif entry[2] is None:
+                    entry[0] = max(entry[0], stat.st_mtime)
+                total += stat.st_size
+        return total, entries
+
+    def evict(self, keep=()):
+        """
+        Delete least recently used videos until the cache fits its byte budget.
+
+        Derived files left without their video are evicted the same way.
+        """
+        with self._lock:
+            total, entries = self._usage()
+            if total <= self.max_bytes:
+                return
+
+            keep = {os.path.abspath(path) for path in keep}
+            leased = self._leased()
+            for content_hash, (_, size, path) in sorted(entries.items(), key=lambda item: item[1][0]):
+                if total <= self.max_bytes:
+                    break
+                if content_hash in leased or (path and os.path.abspath(path) in keep):
+                    continue
+                if path:
+                    try:
+                        # URL entries pointing at this blob become misses on the next lookup
+                        os.unlink(path)
+                        logger.info(f"Evicted {path} from video cache")
+                    except OSError as e:
+                        logger.warning(f"Could not evict {path}: {str(e)}")
+                        continue
+                self._evict_derived(content_hash)
+                total -= size
+
+    def _evict_derived(self, content_hash):
+        for directory in self.derived_dirs:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if name.startswith(content_hash):
+                    try:
+                        os.unlink(os.path.join(directory, name))
+                    except OSError:
+                        pass
+
+# Process-wide cache shared by all sessions
+video_cache = VideoCache(derived_dirs=(AUDIO_CACHE_DIR,))
@@ -1,34 +1,55 @@
 import logging
+import os
 import tempfile
+import threading
+from contextlib import contextmanager
 import requests
-from src.config.settings import MAX_VIDEO_SIZE_MB
+from src.config.settings import MAX_VIDEO_SIZE_MB, VIDEO_CACHE_ENABLED
+from src.api.http_client import get_session
+from src.services.video_cache import video_cache
 
 logger = logging.getLogger(__name__)
 
-def download_video(url, max_size_mb=MAX_VIDEO_SIZE_MB):
+def download_video(url, max_size_mb=MAX_VIDEO_SIZE_MB, dest_dir=None):
     """
     Download video with size limit and error handling.
+
+    Args:
+        url (str): Video URL
+        max_size_mb (int): Maximum allowed size in MB
+        dest_dir (str): Directory for the downloaded file (system temp dir by default)
+
     Returns:
         tuple: (file_path, error_message)
     """
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        content_length = int(response.headers.get('content-length', 0))
-        file_size_mb = content_length / (1024 * 1024)
-        
-        if file_size_mb > max_size_mb:
-            error_msg = f"Video size ({file_size_mb:.1f}MB) exceeds limit ({max_size_mb}MB)"
-            logger.warning(error_msg)
-            return None, error_msg
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    tmp_file.write(chunk)
-            logger.info(f"Video downloaded successfully to {tmp_file.name}")
-            return tmp_file.name, None
+        response = get_session().get(url, stream=True)
+        try:
+            response.raise_for_status()
+            
+            content_length = int(response.headers.get('content-length', 0))
+            file_size_mb = content_length / (1024 * 1024)
+            
+            if file_size_mb > max_size_mb:
+                error_msg = f"Video size ({file_size_mb:.1f}MB) exceeds limit ({max_size_mb}MB)"
+                logger.warning(error_msg)
+                return None, error_msg
+            
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4', dir=dest_dir) as tmp_file:
+                try:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        if chunk:
+                            tmp_file.write(chunk)
+                except Exception:
+                    # Don't leave a partial download behind, e.g. in the cache's download dir
+                    tmp_file.close()
+                    os.unlink(tmp_file.name)
+                    raise
+                logger.info(f"Video downloaded successfully to {tmp_file.name}")
+                return tmp_file.name, None
+        finally:
+            # Hand the connection back to the pool even when the body was not read
+            response.close()
             
     except requests.exceptions.RequestException as e:
         error_msg = f"Failed to download video: {str(e)}"
@@ -37,4 +58,167 @@ def download_video(url, max_size_mb=MAX_VIDEO_SIZE_MB):
     except Exception as e:
         error_msg = f"Unexpected error while downloading video: {str(e)}"
         logger.error(error_msg)
-        return None, error_msg 
\ No newline at end of file
+        return None, error_msg 
+
+class _SharedVideo:
+    """Book-keeping for one URL handed out by SharedVideoDownloads."""
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self.path = None
+        self.error = None
+        self.refs = 0
+        self.cached = False
+        self.lease = None
+
+
+class SharedVideoDownloads:
+    """
+    Download each video URL once and share the local file between consumers.
+
+    Every consumer acquires the URL and releases it when done. The first
+    acquire downloads the file, concurrent acquires wait for that download,
+    and the file is deleted when the last consumer releases it. Inside a
+    `scope()` deletion is deferred until the scope closes, so methods that run
+    one after another in the same job still reuse the download.
+
+    With a `VideoCache`, downloads are looked up in and stored to the cache
+    instead, and cached files are left on disk for later jobs. Cached files
+    are leased while held, so other processes can't evict them.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._videos = {}
+        self._scopes = 0
+        self._deferred = set()
+
+    def acquire(self, url):
+        """
+        Get a local file for the video, downloading it if nobody holds it yet.
+
+        Returns:
+            tuple: (file_path, error_message)
+        """
+        with self._lock:
+            video = self._videos.get(url)
+            is_owner = video is None
+            if is_owner:
+                video = _SharedVideo()
+                self._videos[url] = video
+            video.refs += 1
+
+        if is_owner:
+            try:
+                self._fetch(url, video)
+            except Exception as e:
+                video.error = f"Unexpected error while downloading video: {str(e)}"
+            finally:
+                video.ready.set()
+        else:
+            logger.debug(f"Reusing shared download for {url}")
+            video.ready.wait()
+
+        if video.error:
+            with self._lock:
+                video.refs -= 1
+                # Drop failed downloads so a later acquire can retry
+                if self._videos.get(url) is video:
+                    del self._videos[url]
+            return None, video.error
+
+        return video.path, None
+
+    def _fetch(self, url, video):
+        """Fill in the video's path from the cache or a fresh download."""
+        if self.cache is None:
+            video.path, video.error = download_video(url)
+            return
+
+        cached_path = self.cache.get(url)
+        if cached_path:
+            lease = self.cache.lease(cached_path)
+            if os.path.exists(cached_path):
+                video.path, video.cached, video.lease = cached_path, True, lease
+                return
+            # Evicted by another process before the lease was taken
+            self.cache.release_lease(lease)
+
+        video.path, video.error = download_video(url, dest_dir=self.cache.download_dir())
+        if video.error:
+            return
+
+        try:
+            with self._lock:
+                in_use = [v.path for v in self._videos.values() if v.cached and v.path]
+            video.path = self.cache.put(url, video.path, keep=in_use)
+            video.cached = True
+            video.lease = self.cache.lease(video.path)
+        except Exception as e:
+            # Fall back to the uncached download, which is deleted on release
+            logger.warning(f"Could not cache video {url}: {str(e)}")
+
+    def release(self, url):
+        """Release a video acquired with `acquire` and delete it once unused."""
+        with self._lock:
+            video = self._videos.get(url)
+            if video is None:
+                return
+            video.refs -= 1
+            if video.refs > 0:
+                return
+            if self._scopes:
+                self._deferred.add(url)
+                return
+            del self._videos[url]
+
+        self._delete(video)
+
+    @contextmanager
+    def video(self, url):
+        """
+        Context manager around acquire/release.
+
+        Yields:
+            tuple: (file_path, error_message)
+        """
+        path, error = self.acquire(url)
+        try:
+            yield path, error
+        finally:
+            if not error:
+                self.release(url)
+
+    @contextmanager
+    def scope(self):
+        """Keep released videos on disk until the outermost scope closes."""
+        with self._lock:
+            self._scopes += 1
+        try:
+            yield self
+        finally:
+            expired = []
+            with self._lock:
+                self._scopes -= 1
+                if not self._scopes:
+                    for url in self._deferred:
+                        video = self._videos.get(url)
+                        if video is not None and video.refs == 0:
+                            expired.append(self._videos.pop(url))
+                    self._deferred.clear()
+            for video in expired:
+                self._delete(video)
+
+    def _delete(self, video):
+        if video.lease:
+            self.cache.release_lease(video.lease)
+        if video.cached:
+            return
+        if video.path and os.path.exists(video.path):
+            os.unlink(video.path)
+            logger.debug(f"Removed shared video {video.path}")
+
+
+# Process-wide instance shared by all analysis methods
+shared_downloads = SharedVideoDownloads(cache=video_cache if VIDEO_CACHE_ENABLED else None)
@@ -0,0 +1,25 @@
+"""
+Shared helpers used across API clients and services.
+"""
+
+from .batching import estimate_tokens, split_batches
+from .hashing import file_sha256, text_sha256
+from .json_cache import JsonDirectoryCache, JsonFileCache
+from .single_flight import SingleFlightCache, Uncached
+from .response_parser import VIDEO_INFO_SCHEMA, extract_video_info, has_youtube_video_link, matches_schema, validate_structured
+
+__all__ = [
+    'estimate_tokens',
+    'split_batches',
+    'file_sha256',
+    'text_sha256',
+    'JsonDirectoryCache',
+    'JsonFileCache',
+    'SingleFlightCache',
+    'Uncached',
+    'extract_video_info',
+    'has_youtube_video_link',
+    'matches_schema',
+    'validate_structured',
+    'VIDEO_INFO_SCHEMA'
+]
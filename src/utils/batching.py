@@ -0,0 +1,30 @@
+def estimate_tokens(text):
+    """Rough token count for budgeting prompts, about four characters per token."""
+    return len(text) // 4 + 1
+
+def split_batches(items, max_size, size=len):
+    """
+    Group (key, value) pairs into batches whose total size stays within `max_size`.
+
+    An item larger than `max_size` gets a batch of its own.
+
+    Args:
+        items (iterable): (key, value) pairs, batched in order
+        max_size (int): Size budget per batch
+        size (callable): Measures a value, `len` by default
+
+    Returns:
+        list: Batches as dicts of key to value
+    """
+    batches = []
+    batch, total = {}, 0
+    for key, value in items:
+        item_size = size(value)
+        if batch and total + item_size > max_size:
+            batches.append(batch)
+            batch, total = {}, 0
+        batch[key] = value
+        total += item_size
+    if batch:
+        batches.append(batch)
+    return batches
@@ -0,0 +1,22 @@
+import hashlib
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """
+    Compute the SHA-256 hex digest of a file without loading it into memory.
+
+    Args:
+        path (str): Path to the file
+        chunk_size (int): Number of bytes read per iteration
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def text_sha256(text):
+    """Compute the SHA-256 hex digest of a string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,239 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from src.utils.hashing import text_sha256
+
+logger = logging.getLogger(__name__)
+
+class JsonFileCache:
+    """
+    Small persistent key/value cache stored in a single JSON file.
+
+    Every write rewrites the whole file, so large values belong in
+    `JsonDirectoryCache` instead.
+
+    Entries can carry an expiry time and the cache can be bounded by entry
+    count, evicting the least recently used entries first. The file is
+    rewritten atomically with `os.replace` and re-read when another process
+    has changed it, so it is safe to share between concurrent sessions.
+    """
+
+    def __init__(self, path, ttl=None, max_entries=None):
+        """
+        Args:
+            path (str): Location of the JSON file
+            ttl (float): Default lifetime of entries in seconds, None to keep them until evicted
+            max_entries (int): Maximum number of entries, None for no limit
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._mtime = None
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache file {self.path}: {str(e)}")
+            self._entries = {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._mtime = os.path.getmtime(self.path)
+
+    def get(self, key):
+        """
+        Look up a value.
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            now = time.time()
+            expires_at = entry.get("expires_at")
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                self._save()
+                return None
+
+            # Access time only matters for eviction order, so don't rewrite the file for it
+            entry["accessed_at"] = now
+            return entry["value"]
+
+    def set(self, key, value, expires_at=None):
+        """
+        Store a value.
+
+        Args:
+            key (str): Cache key
+            value: JSON-serializable value
+            expires_at (float): Unix time the entry expires, defaults to now + ttl
+        """
+        with self._lock:
+            self._load()
+            now = time.time()
+            if expires_at is None and self.ttl is not None:
+                expires_at = now + self.ttl
+            self._entries[key] = {"value": value, "expires_at": expires_at, "accessed_at": now}
+            self._evict(now)
+            self._save()
+
+    def delete(self, key):
+        """Remove a key if present."""
+        with self._lock:
+            self._load()
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def _evict(self, now):
+        expired = [key for key, entry in self._entries.items()
+                   if entry.get("expires_at") is not None and entry["expires_at"] <= now]
+        for key in expired:
+            del self._entries[key]
+
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            by_access = sorted(self._entries, key=lambda key: self._entries[key].get("accessed_at", 0))
+            for key in by_access[:len(self._entries) - self.max_entries]:
+                del self._entries[key]
+
+class JsonDirectoryCache:
+    """
+    Persistent key/value cache storing each entry in its own JSON file.
+
+    Meant for large values such as transcripts, where rewriting one shared
+    file on every write would cost more than the lookup saves. Files are
+    named after the key's hash and written atomically with `os.replace`.
+    Reads refresh the file's mtime, which eviction uses as the LRU order,
+    like `VideoCache`. Expired entries are removed when they are read.
+    """
+
+    def __init__(self, directory, ttl=None, max_entries=None):
+        """
+        Args:
+            directory (str): Directory holding the entry files
+            ttl (float): Default lifetime of entries in seconds, None to keep them until evicted
+            max_entries (int): Maximum number of entries, None for no limit
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, f"{text_sha256(key)}.json")
+
+    def get(self, key):
+        """
+        Look up a value.
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except OSError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable cache file {path}: {str(e)}")
+            return None
+
+        if entry.get("key") != key:
+            return None
+
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+
+        try:
+            # Mark as recently used
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["value"]
+
+    def set(self, key, value, expires_at=None):
+        """
+        Store a value.
+
+        Args:
+            key (str): Cache key
+            value: JSON-serializable value
+            expires_at (float): Unix time the entry expires, defaults to now + ttl
+        """
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "value": value, "expires_at": expires_at}, f)
+            os.replace(tmp_path, self._entry_path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._evict()
+
+    def delete(self, key):
+        """Remove a key if present."""
+        try:
+            os.unlink(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        if self.max_entries is None:
+            return
+
+        with self._lock:
+            entries = []
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.stat(path).st_mtime, path))
+                except OSError:
+                    continue
+
+            for _, path in sorted(entries)[:max(0, len(entries) - self.max_entries)]:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
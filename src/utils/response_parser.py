@@ -0,0 +1,165 @@
+import ast
+import json
+import re
+
+VIDEO_INFO_FIELDS = ['title', 'channel', 'channelLink', 'url']
+
+# JSON schema for schema-constrained model output
+VIDEO_INFO_SCHEMA = {
+    "type": "object",
+    "properties": {field: {"type": "string"} for field in VIDEO_INFO_FIELDS},
+    "required": VIDEO_INFO_FIELDS,
+}
+
+YOUTUBE_VIDEO_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.|m\.)?(?:youtube\.com/(?:watch\?v=|shorts/|live/)|youtu\.be/)[\w-]{6,}[^\s\"'<>)\]]*"
+)
+YOUTUBE_CHANNEL_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.|m\.)?youtube\.com/(?:@[\w.-]+|channel/[\w-]+|c/[\w.-]+|user/[\w.-]+)"
+)
+FENCED_BLOCK_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+# Alternative key names models use for each field
+FIELD_ALIASES = {
+    'title': ['title', 'video_title', 'videoTitle', 'podcast_title', 'episode_title'],
+    'channel': ['channel', 'channel_name', 'channelName', 'youtube_channel'],
+    'channelLink': ['channelLink', 'channel_link', 'channel link', 'channelUrl', 'channel_url'],
+    'url': ['url', 'youtube_url', 'youtubeUrl', 'video_url', 'videoUrl', 'link'],
+}
+
+def has_youtube_video_link(text):
+    """Check whether the text contains a link to a specific YouTube video."""
+    return bool(YOUTUBE_VIDEO_PATTERN.search(str(text or '')))
+
+def matches_schema(value, schema):
+    """
+    Check a parsed object against a flat object schema.
+
+    Only the parts of JSON Schema used for flat records are checked: the
+    top-level object type, required keys, and the primitive type of each
+    declared property.
+
+    Returns:
+        bool: Whether the object matches
+    """
+    if not isinstance(value, dict):
+        return False
+
+    if any(key not in value for key in schema.get('required', [])):
+        return False
+
+    types = {'string': str, 'number': (int, float), 'integer': int, 'boolean': bool, 'array': list, 'object': dict}
+    for key, spec in schema.get('properties', {}).items():
+        expected = types.get(spec.get('type'))
+        if key in value and expected and not isinstance(value[key], expected):
+            return False
+    return True
+
+def validate_structured(text, schema):
+    """
+    Parse model output as JSON and check it against a flat object schema.
+
+    Args:
+        text (str): Model output
+        schema (dict): JSON schema the output was requested with
+
+    Returns:
+        dict: The parsed object, or None if it does not match the schema
+    """
+    try:
+        value = json.loads(text.strip())
+    except (AttributeError, ValueError):
+        return None
+    return value if matches_schema(value, schema) else None
+
+def _parse_structure(text):
+    """Parse text as JSON, or as a Python literal such as `str(dict)`."""
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            return parse(text)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            continue
+    return None
+
+def _unwrap(raw_response):
+    """Peel `{"raw_response": ...}` wrappers from API results down to the model text or object."""
+    value = raw_response
+    for _ in range(5):
+        if isinstance(value, str):
+            parsed = _parse_structure(value.strip())
+            if not isinstance(parsed, (dict, list)):
+                return value
+            value = parsed
+        if isinstance(value, dict) and 'raw_response' in value:
+            value = value['raw_response']
+            continue
+        return value
+    return value
+
+def _json_candidates(text):
+    """Yield objects that could hold the video info, most explicit first."""
+    for block in FENCED_BLOCK_PATTERN.findall(text):
+        parsed = _parse_structure(block.strip())
+        if parsed is not None:
+            yield parsed
+
+    parsed = _parse_structure(text.strip())
+    if parsed is not None:
+        yield parsed
+
+    start = text.find('{')
+    end = text.rfind('}')
+    if 0 <= start < end:
+        parsed = _parse_structure(text[start:end + 1])
+        if parsed is not None:
+            yield parsed
+
+def _normalize(candidate):
+    """Map a parsed object onto the video info fields."""
+    if isinstance(candidate, list):
+        candidate = next((item for item in candidate if isinstance(item, dict)), None)
+    if not isinstance(candidate, dict):
+        return None
+
+    info = {}
+    for field, aliases in FIELD_ALIASES.items():
+        value = next((candidate[alias] for alias in aliases if candidate.get(alias)), "")
+        info[field] = value.strip() if isinstance(value, str) else ""
+    return info
+
+def extract_video_info(raw_response):
+    """
+    Extract YouTube video information from an API response without an LLM.
+
+    Tries strict JSON, fenced code blocks, and Python reprs of API results,
+    then fills any missing links from YouTube URLs found in the text.
+
+    Args:
+        raw_response: Raw API response, as text or a result dict
+
+    Returns:
+        tuple: (info dict with title/channel/channelLink/url, confident bool).
+            The result is confident when it has a YouTube video URL plus a
+            title or channel.
+    """
+    value = _unwrap(raw_response)
+    text = value if isinstance(value, str) else json.dumps(value)
+
+    info = None
+    candidates = [value] if isinstance(value, (dict, list)) else _json_candidates(text)
+    for candidate in candidates:
+        info = _normalize(candidate)
+        if info and any(info.values()):
+            break
+    if not info:
+        info = {field: "" for field in VIDEO_INFO_FIELDS}
+
+    if not has_youtube_video_link(info['url']):
+        video_match = YOUTUBE_VIDEO_PATTERN.search(text)
+        info['url'] = video_match.group(0) if video_match else info['url']
+    if not info['channelLink']:
+        channel_match = YOUTUBE_CHANNEL_PATTERN.search(text)
+        info['channelLink'] = channel_match.group(0) if channel_match else ""
+
+    confident = has_youtube_video_link(info['url']) and bool(info['title'] or info['channel'])
+    return info, confident
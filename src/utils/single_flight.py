@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+class Uncached:
+    """Wraps a loaded value that is returned to callers but not cached."""
+
+    def __init__(self, value):
+        self.value = value
+
+class SingleFlightCache:
+    """
+    In-memory TTL cache that collapses concurrent loads of the same key.
+
+    Values missing from the cache are loaded in one call for all missing
+    keys. While a key is being loaded, other threads asking for it wait for
+    that load instead of starting their own. Failed loads are not cached;
+    the error is raised to every waiting caller.
+    """
+
+    def __init__(self, max_entries=None):
+        """
+        Args:
+            max_entries (int): Maximum number of cached values, None for no limit
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+    def get_many(self, keys, load, ttl):
+        """
+        Get values for several keys, loading the missing ones.
+
+        Args:
+            keys (list): Cache keys
+            load (callable): Called with the list of keys to load, returns a dict of key to value.
+                Values wrapped in `Uncached` are returned without being cached.
+            ttl (float): Seconds to keep loaded values, 0 to not cache them
+
+        Returns:
+            dict: Values keyed by cache key
+
+        Raises:
+            Exception: Whatever `load` raised, for this or a concurrent caller
+        """
+        results = {}
+        owned = []
+        waiting = {}
+        with self._lock:
+            now = time.monotonic()
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    results[key] = entry[1]
+                elif key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                else:
+                    self._inflight[key] = Future()
+                    owned.append(key)
+
+        if owned:
+            try:
+                loaded = load(owned)
+            except BaseException as e:
+                with self._lock:
+                    for key in owned:
+                        self._inflight.pop(key).set_exception(e)
+                raise
+
+            with self._lock:
+                expires_at = time.monotonic() + ttl
+                for key in owned:
+                    value = loaded.get(key)
+                    store = not isinstance(value, Uncached)
+                    if not store:
+                        value = value.value
+                    self._inflight.pop(key).set_result(value)
+                    results[key] = value
+                    if store and ttl > 0:
+                        self._entries[key] = (expires_at, value)
+                        self._entries.move_to_end(key)
+                self._evict()
+
+        for key, future in waiting.items():
+            results[key] = future.result()
+        return results
+
+    def clear(self):
+        """Drop all cached values."""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -2,6 +2,8 @@ import pytest
 from unittest.mock import MagicMock, patch
 from src.api.apify_client import ApifyService
 
+FINISHED_RUN = {"id": "run1", "status": "SUCCEEDED", "defaultDatasetId": "test"}
+
 @pytest.fixture
 def mock_apify():
     """Mock Apify client for testing."""
@@ -20,7 +22,7 @@ def test_search_youtube_podcasts_success(apify_service, mock_apify, sample_youtu
     mock_dataset = MagicMock()
     mock_dataset.list_items.return_value.items = [sample_youtube_result]
     mock_apify.dataset.return_value = mock_dataset
-    mock_apify.actor.return_value.call.return_value = {"defaultDatasetId": "test"}
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
     
     results = apify_service.search_youtube_podcasts("test query")
     
@@ -35,7 +37,7 @@ def test_search_youtube_podcasts_no_url(apify_service, mock_apify):
     mock_dataset = MagicMock()
     mock_dataset.list_items.return_value.items = [result_without_url]
     mock_apify.dataset.return_value = mock_dataset
-    mock_apify.actor.return_value.call.return_value = {"defaultDatasetId": "test"}
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
     
     results = apify_service.search_youtube_podcasts("test query")
     
@@ -44,7 +46,7 @@ def test_search_youtube_podcasts_no_url(apify_service, mock_apify):
 
 def test_search_youtube_podcasts_failure(apify_service, mock_apify):
     """Test YouTube search failure."""
-    mock_apify.actor.return_value.call.side_effect = Exception("API Error")
+    mock_apify.actor.return_value.start.side_effect = Exception("API Error")
     
     results = apify_service.search_youtube_podcasts("test query")
     
@@ -56,7 +58,7 @@ def test_search_instagram_posts_success(apify_service, mock_apify, sample_instag
     mock_dataset = MagicMock()
     mock_dataset.list_items.return_value.items = [sample_instagram_post]
     mock_apify.dataset.return_value = mock_dataset
-    mock_apify.actor.return_value.call.return_value = {"defaultDatasetId": "test"}
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
     
     results = apify_service.search_instagram_posts("testuser")
     
@@ -67,9 +69,193 @@ def test_search_instagram_posts_success(apify_service, mock_apify, sample_instag
 
 def test_search_instagram_posts_failure(apify_service, mock_apify):
     """Test Instagram search failure."""
-    mock_apify.actor.return_value.call.side_effect = Exception("API Error")
+    mock_apify.actor.return_value.start.side_effect = Exception("API Error")
     
     results = apify_service.search_instagram_posts("testuser")
     
     assert len(results) == 0
-    mock_apify.actor.assert_called_once() 
\ No newline at end of file
+    mock_apify.actor.assert_called_once()
+
+def test_search_youtube_podcasts_multi(apify_service, mock_apify):
+    """Test several queries share one actor run and are split by query."""
+    mock_apify.dataset.return_value.list_items.return_value.items = [
+        {"id": "a", "input": "sleep podcast"},
+        {"id": "b", "input": "Huberman  sleep"},
+        {"id": "c", "input": "sleep podcast"},
+    ]
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
+
+    results = apify_service.search_youtube_podcasts_multi(["sleep podcast", "huberman sleep"], max_results=5)
+
+    mock_apify.actor.return_value.start.assert_called_once()
+    assert mock_apify.actor.return_value.start.call_args.kwargs["run_input"]["searchQueries"] == ["sleep podcast", "huberman sleep"]
+    assert [item["id"] for item in results["sleep podcast"]] == ["a", "c"]
+    assert [item["id"] for item in results["huberman sleep"]] == ["b"]
+
+def test_search_youtube_podcasts_multi_unmatched(apify_service, mock_apify):
+    """Test untagged items of a multi-query run are kept apart."""
+    mock_apify.dataset.return_value.list_items.return_value.items = [{"id": "a"}]
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
+
+    results = apify_service.search_youtube_podcasts_multi(["first", "second"])
+
+    assert results["first"] == [] and results["second"] == []
+    assert [item["id"] for item in results[None]] == ["a"]
+
+def test_search_youtube_podcasts_multi_unmatched_not_cached(apify_service, mock_apify):
+    """Test queries of a run with untagged items are searched again instead of served empty from the cache."""
+    mock_apify.dataset.return_value.list_items.return_value.items = [{"id": "a"}]
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
+    apify_service.search_youtube_podcasts_multi(["first", "second"])
+
+    results = apify_service.search_youtube_podcasts("first")
+
+    assert mock_apify.actor.return_value.start.call_count == 2
+    assert [item["id"] for item in results] == ["a"]
+
+def test_search_instagram_posts_bulk(apify_service, mock_apify):
+    """Test several accounts share one actor run with per-account limits."""
+    mock_apify.dataset.return_value.list_items.return_value.items = [
+        {"id": "1", "ownerUsername": "alice"},
+        {"id": "2", "ownerUsername": "Bob"},
+        {"id": "3", "ownerUsername": "alice"},
+        {"id": "4", "ownerUsername": "alice"},
+        {"id": "5", "inputUrl": "https://www.instagram.com/bob/"},
+    ]
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
+
+    results = apify_service.search_instagram_posts_bulk(["alice", "bob"], max_results=2)
+
+    mock_apify.actor.return_value.start.assert_called_once()
+    assert mock_apify.actor.return_value.start.call_args.kwargs["run_input"]["directUrls"] == [
+        "https://www.instagram.com/alice", "https://www.instagram.com/bob"
+    ]
+    assert [post["id"] for post in results["alice"]] == ["1", "3"]
+    assert [post["id"] for post in results["bob"]] == ["2", "5"]
+
+def test_search_youtube_podcasts_multi_cached(apify_service, mock_apify):
+    """Test cached queries are not searched again and only new ones start a run."""
+    mock_apify.dataset.return_value.list_items.return_value.items = [{"id": "a", "input": "sleep podcast"}]
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
+    apify_service.search_youtube_podcasts_multi(["sleep podcast"], max_results=5)
+
+    mock_apify.dataset.return_value.list_items.return_value.items = [{"id": "b", "input": "diet podcast"}]
+    results = apify_service.search_youtube_podcasts_multi(["Sleep  Podcast", "diet podcast"], max_results=5)
+
+    assert mock_apify.actor.return_value.start.call_count == 2
+    assert mock_apify.actor.return_value.start.call_args.kwargs["run_input"]["searchQueries"] == ["diet podcast"]
+    assert [item["id"] for item in results["Sleep  Podcast"]] == ["a"]
+    assert [item["id"] for item in results["diet podcast"]] == ["b"]
+
+def test_search_instagram_posts_failure_not_cached(apify_service, mock_apify):
+    """Test failed runs are retried on the next search instead of served from the cache."""
+    mock_apify.actor.return_value.start.side_effect = [Exception("API Error"), FINISHED_RUN]
+    mock_apify.dataset.return_value.list_items.return_value.items = [{"id": "1", "ownerUsername": "alice"}]
+
+    assert apify_service.search_instagram_posts("alice") == []
+    assert [post["id"] for post in apify_service.search_instagram_posts("@Alice")] == ["1"]
+    assert [post["id"] for post in apify_service.search_instagram_posts("alice")] == ["1"]
+    assert mock_apify.actor.return_value.start.call_count == 2
+
+def test_search_instagram_posts_bulk_normalizes_usernames(apify_service, mock_apify):
+    """Test usernames given with "@" are fetched and matched without it."""
+    mock_apify.dataset.return_value.list_items.return_value.items = [
+        {"id": "1", "ownerUsername": "alice"},
+        {"id": "2", "inputUrl": "https://www.instagram.com/bob/"},
+        {"id": "3", "inputUrl": None},
+    ]
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
+
+    results = apify_service.search_instagram_posts_bulk(["@Alice", "bob"])
+
+    assert mock_apify.actor.return_value.start.call_args.kwargs["run_input"]["directUrls"] == [
+        "https://www.instagram.com/alice", "https://www.instagram.com/bob"
+    ]
+    assert [post["id"] for post in results["@Alice"]] == ["1"]
+    assert [post["id"] for post in results["bob"]] == ["2"]
+
+def test_search_instagram_posts_bulk_empty_not_cached(apify_service, mock_apify):
+    """Test an account left empty by a multi-account run is fetched again on its own."""
+    mock_apify.dataset.return_value.list_items.return_value.items = [{"id": "2", "ownerUsername": "bob"}]
+    mock_apify.actor.return_value.start.return_value = FINISHED_RUN
+    apify_service.search_instagram_posts_bulk(["@alice", "bob"])
+
+    mock_apify.dataset.return_value.list_items.return_value.items = [{"id": "1", "ownerUsername": "alice"}]
+    results = apify_service.search_instagram_posts("alice")
+
+    assert mock_apify.actor.return_value.start.call_count == 2
+    assert mock_apify.actor.return_value.start.call_args.kwargs["run_input"]["directUrls"] == ["https://www.instagram.com/alice"]
+    assert [post["id"] for post in results] == ["1"]
+
+def test_as_completed_yields_in_completion_order(apify_service, mock_apify):
+    """Test concurrent runs are collected as they finish."""
+    statuses = {"slow": iter(["RUNNING", "SUCCEEDED"]), "fast": iter(["SUCCEEDED"])}
+    mock_apify.run.side_effect = lambda run_id: MagicMock(get=lambda: {"id": run_id, "status": next(statuses[run_id])})
+    runs = {"youtube": {"id": "slow", "status": "READY"}, "instagram": {"id": "fast", "status": "READY"}}
+
+    with patch('src.api.apify_client.time.sleep'):
+        finished = list(apify_service.as_completed(runs))
+
+    assert [key for key, _ in finished] == ["instagram", "youtube"]
+    assert all(run["status"] == "SUCCEEDED" for _, run in finished)
+
+def test_as_completed_aborts_after_deadline(apify_service, mock_apify):
+    """Test runs past their deadline are aborted instead of blocking."""
+    run_client = MagicMock()
+    run_client.get.return_value = {"id": "stuck", "status": "RUNNING"}
+    run_client.abort.return_value = {"id": "stuck", "status": "ABORTING"}
+    mock_apify.run.return_value = run_client
+
+    finished = list(apify_service.as_completed({"stuck": {"id": "stuck", "status": "RUNNING"}}, timeout=0))
+
+    assert finished == [("stuck", {"id": "stuck", "status": "ABORTING"})]
+    run_client.abort.assert_called_once()
+
+def test_as_completed_cancel(apify_service, mock_apify):
+    """Test setting the cancel event aborts unfinished runs."""
+    import threading
+    cancel = threading.Event()
+    cancel.set()
+    mock_apify.run.return_value.get.return_value = {"id": "run1", "status": "RUNNING"}
+    mock_apify.run.return_value.abort.return_value = {"id": "run1", "status": "ABORTING"}
+
+    finished = list(apify_service.as_completed({"run": {"id": "run1"}}, cancel_event=cancel))
+
+    assert finished[0][1]["status"] == "ABORTING"
+
+def test_search_youtube_podcasts_timeout(apify_service, mock_apify):
+    """Test a run that never finishes yields no results instead of hanging."""
+    mock_apify.actor.return_value.start.return_value = {"id": "run1", "status": "RUNNING"}
+    mock_apify.run.return_value.get.return_value = {"id": "run1", "status": "RUNNING"}
+    mock_apify.run.return_value.abort.return_value = {"id": "run1", "status": "ABORTING"}
+
+    assert apify_service.search_youtube_podcasts_multi(["query"], timeout=0) == {}
+    mock_apify.run.return_value.abort.assert_called_once()
+
+def _pages(items):
+    """Serve items from a mocked dataset in pages."""
+    def list_items(offset=0, limit=None, fields=None):
+        return MagicMock(items=items[offset:offset + limit], total=len(items))
+    return list_items
+
+def test_iter_dataset_items_pages(apify_service, mock_apify):
+    """Test datasets are read page by page with the requested fields."""
+    items = [{"id": str(i)} for i in range(5)]
+    mock_apify.dataset.return_value.list_items.side_effect = _pages(items)
+
+    result = list(apify_service.iter_dataset_items("dataset", fields=["id"], page_size=2))
+
+    assert result == items
+    calls = mock_apify.dataset.return_value.list_items.call_args_list
+    assert [call.kwargs["offset"] for call in calls] == [0, 2, 4]
+    assert all(call.kwargs["fields"] == ["id"] for call in calls)
+
+def test_group_by_owner_stops_when_full():
+    """Test reading stops once every account has enough posts."""
+    from src.api.apify_client import _group_by_owner
+    items = iter([{"id": str(i), "ownerUsername": "alice"} for i in range(10)])
+
+    results = _group_by_owner(items, ["alice"], max_results=3)
+
+    assert [post["id"] for post in results["alice"]] == ["0", "1", "2"]
+    assert next(items)["id"] == "3"
@@ -0,0 +1,179 @@
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from src.api.gemini_client import _upload_file, gemini_process_video
+from src.api.http_client import get_session
+
+def make_response(headers=None, json_data=None):
+    """Build a mock HTTP response."""
+    response = MagicMock()
+    response.headers = headers or {}
+    response.json.return_value = json_data or {}
+    return response
+
+@pytest.fixture
+def video_file(tmp_path):
+    """A 10-byte video file."""
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"0123456789")
+    return str(path)
+
+def test_upload_file_in_chunks(video_file):
+    """Test the file is streamed in chunk-sized pieces and finalized."""
+    uploaded = {"uri": "files/abc", "name": "files/abc"}
+    sent = []
+
+    def post(url, headers=None, data=None, **kwargs):
+        sent.append((headers["X-Goog-Upload-Offset"], headers["X-Goog-Upload-Command"], data))
+        return make_response(json_data={"file": uploaded})
+
+    with patch.object(get_session(), 'post', side_effect=post):
+        result = _upload_file("https://upload", video_file, 10, chunk_size=4)
+
+    assert result == uploaded
+    assert sent == [
+        ("0", "upload", b"0123"),
+        ("4", "upload", b"4567"),
+        ("8", "upload, finalize", b"89")
+    ]
+
+def test_upload_file_resumes_after_failure(video_file):
+    """Test a failed chunk resumes from the offset the server acknowledged."""
+    uploaded = {"uri": "files/abc", "name": "files/abc"}
+    sent = []
+    failed = []
+
+    def post(url, headers=None, data=None, **kwargs):
+        if headers["X-Goog-Upload-Command"] == "query":
+            return make_response(headers={"x-goog-upload-status": "active", "x-goog-upload-size-received": "4"})
+        sent.append(headers["X-Goog-Upload-Offset"])
+        if headers["X-Goog-Upload-Offset"] == "4" and not failed:
+            failed.append(True)
+            raise requests.exceptions.ConnectionError("connection reset")
+        return make_response(json_data={"file": uploaded})
+
+    with patch.object(get_session(), 'post', side_effect=post), \
+         patch('src.api.gemini_client.time.sleep'):
+        result = _upload_file("https://upload", video_file, 10, chunk_size=4)
+
+    assert result == uploaded
+    assert sent == ["0", "4", "4", "8"]
+
+def test_upload_file_gives_up_after_retries(video_file):
+    """Test the upload fails after too many consecutive errors."""
+    def post(url, headers=None, data=None, **kwargs):
+        if headers["X-Goog-Upload-Command"] == "query":
+            return make_response(headers={"x-goog-upload-size-received": "0"})
+        raise requests.exceptions.ConnectionError("connection reset")
+
+    with patch.object(get_session(), 'post', side_effect=post), \
+         patch('src.api.gemini_client.time.sleep'):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            _upload_file("https://upload", video_file, 10, chunk_size=4, max_retries=2)
+
+def test_gemini_process_video_missing_file():
+    """Test processing a missing video returns an error."""
+    result = gemini_process_video("/nonexistent/video.mp4")
+
+    assert "Video file not found" in result["error"]
+
+def test_wait_for_active_returns_ready_file():
+    """Test an already active file is returned without polling."""
+    from src.api.gemini_client import _wait_for_active
+    ready = {"name": "files/abc", "uri": "files/abc", "state": "ACTIVE"}
+
+    with patch.object(get_session(), 'get') as mock_get:
+        assert _wait_for_active(ready) == ready
+
+    mock_get.assert_not_called()
+
+def test_wait_for_active_polls_until_ready():
+    """Test the file state is polled until it becomes active."""
+    from src.api.gemini_client import _wait_for_active
+    states = iter(["PROCESSING", "ACTIVE"])
+
+    def get(url, **kwargs):
+        return make_response(json_data={"name": "files/abc", "uri": "files/abc", "state": next(states)})
+
+    with patch.object(get_session(), 'get', side_effect=get) as mock_get, \
+         patch('src.api.gemini_client.time.sleep'):
+        result = _wait_for_active({"name": "files/abc", "state": "PROCESSING"})
+
+    assert result["state"] == "ACTIVE"
+    assert mock_get.call_count == 2
+
+def test_wait_for_active_fails_fast():
+    """Test a failed file raises immediately."""
+    from src.api.gemini_client import _wait_for_active
+
+    with pytest.raises(Exception, match="processing failed"):
+        _wait_for_active({"name": "files/abc", "state": "FAILED", "error": {"message": "bad video"}})
+
+def test_wait_for_active_deadline():
+    """Test polling stops at the deadline."""
+    from src.api.gemini_client import _wait_for_active
+
+    with patch.object(get_session(), 'get', return_value=make_response(json_data={"name": "files/abc", "state": "PROCESSING"})), \
+         patch('src.api.gemini_client.time.sleep'), \
+         pytest.raises(TimeoutError):
+        _wait_for_active({"name": "files/abc", "state": "PROCESSING"}, timeout=0)
+
+@pytest.fixture
+def file_cache(tmp_path):
+    """Replace the Gemini file cache with one in a temporary directory."""
+    from src.utils.json_cache import JsonFileCache
+    cache = JsonFileCache(str(tmp_path / "gemini_files.json"))
+    with patch('src.api.gemini_client.file_cache', cache):
+        yield cache
+
+def test_gemini_reuses_cached_upload(video_file, file_cache):
+    """Test a second analysis of the same video skips the upload."""
+    uploaded = {"uri": "files/abc", "name": "files/abc", "expirationTime": "2999-01-01T00:00:00.123456789Z"}
+
+    with patch('src.api.gemini_client._upload_video', return_value=uploaded) as mock_upload, \
+         patch('src.api.gemini_client._generate', return_value="analysis") as mock_generate:
+        first = gemini_process_video(video_file, inline_max_mb=0)
+        second = gemini_process_video(video_file, inline_max_mb=0)
+
+    assert first == second == {"raw_response": "analysis"}
+    mock_upload.assert_called_once()
+    assert mock_generate.call_count == 2
+
+def test_gemini_reuploads_stale_cached_file(video_file, file_cache):
+    """Test a cached file rejected by the API is uploaded again."""
+    from src.utils.hashing import file_sha256
+    file_cache.set(file_sha256(video_file), {"uri": "files/old", "name": "files/old"}, expires_at=4102444800)
+    uploaded = {"uri": "files/new", "name": "files/new"}
+
+    def generate(video_part):
+        if video_part["file_data"]["file_uri"] == "files/old":
+            raise requests.exceptions.HTTPError("403 Forbidden")
+        return "analysis"
+
+    with patch('src.api.gemini_client._upload_video', return_value=uploaded) as mock_upload, \
+         patch('src.api.gemini_client._generate', side_effect=generate):
+        result = gemini_process_video(video_file, inline_max_mb=0)
+
+    assert result == {"raw_response": "analysis"}
+    mock_upload.assert_called_once()
+    assert file_cache.get(file_sha256(video_file))["uri"] == "files/new"
+
+def test_parse_expiration():
+    """Test RFC 3339 timestamps with nanoseconds are parsed."""
+    from src.api.gemini_client import _parse_expiration
+
+    assert _parse_expiration("1970-01-01T00:01:00.123456789Z") == pytest.approx(60.123456)
+    assert _parse_expiration(None) is None
+
+def test_gemini_inline_small_video(video_file, file_cache):
+    """Test small videos are sent inline without an upload."""
+    import base64
+
+    with patch('src.api.gemini_client._upload_video') as mock_upload, \
+         patch('src.api.gemini_client._generate', return_value="analysis") as mock_generate:
+        result = gemini_process_video(video_file, inline_max_mb=1)
+
+    assert result == {"raw_response": "analysis"}
+    mock_upload.assert_not_called()
+    inline = mock_generate.call_args[0][0]["inline_data"]
+    assert base64.b64decode(inline["data"]) == b"0123456789"
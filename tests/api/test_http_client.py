@@ -0,0 +1,44 @@
+from unittest.mock import patch
+from src.api.http_client import API_HOSTS, create_session, get_session
+
+def test_get_session_shared():
+    """Test all callers get the same pooled session."""
+    assert get_session() is get_session()
+
+def test_api_hosts_have_own_pools():
+    """Test API hosts are mounted with their own, larger pools."""
+    session = create_session(pool_maxsize=4, api_pool_maxsize=16)
+
+    api_adapter = session.get_adapter(f"{API_HOSTS[0]}/chat/completions")
+    default_adapter = session.get_adapter("https://cdninstagram.com/video.mp4")
+
+    assert api_adapter is not default_adapter
+    assert api_adapter._pool_maxsize == 16
+    assert default_adapter._pool_maxsize == 4
+
+def test_default_timeout_applied():
+    """Test requests without a timeout get the session default."""
+    session = create_session(timeout=(1, 2))
+
+    with patch('requests.Session.request') as mock_request:
+        session.get("https://example.com")
+        session.get("https://example.com", timeout=9)
+
+    assert mock_request.call_args_list[0].kwargs["timeout"] == (1, 2)
+    assert mock_request.call_args_list[1].kwargs["timeout"] == 9
+
+def test_get_async_client_per_loop():
+    """Test coroutines on one loop share a client and each loop gets its own."""
+    import asyncio
+    from src.api.http_client import close_async_client, get_async_client
+
+    async def clients():
+        first, second = get_async_client(), get_async_client()
+        await close_async_client()
+        return first, second
+
+    first, second = asyncio.run(clients())
+    other, _ = asyncio.run(clients())
+
+    assert first is second
+    assert other is not first
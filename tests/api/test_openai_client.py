@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import MagicMock, patch
 from src.api.openai_client import OpenAIService
@@ -83,4 +84,61 @@ def test_format_json_response_failure(openai_service, mock_openai):
     assert result["title"] == ""
     assert result["channel"] == ""
     assert result["channelLink"] == ""
-    assert result["url"] == "" 
\ No newline at end of file
+    assert result["url"] == ""
+
+def test_format_json_response_local(openai_service, mock_openai):
+    """Test responses that already hold the video info skip GPT."""
+    raw = str({"raw_response": '{"title": "Test Video", "channel": "Test Channel", "url": "https://www.youtube.com/watch?v=test123"}'})
+
+    result = openai_service.format_json_response(raw)
+
+    assert result["title"] == "Test Video"
+    assert result["url"] == "https://www.youtube.com/watch?v=test123"
+    assert result["channelLink"] == ""
+    mock_openai.chat.completions.create.assert_not_called()
+
+def _completion(content):
+    completion = MagicMock()
+    completion.choices = [MagicMock(message=MagicMock(content=content))]
+    return completion
+
+def test_format_json_responses_batch(openai_service, mock_openai):
+    """Test responses needing GPT are formatted in a single request."""
+    video = {"title": "Test Video", "channel": "Test Channel", "channelLink": "", "url": "https://www.youtube.com/watch?v=test123"}
+    mock_openai.chat.completions.create.return_value = _completion(
+        json.dumps({"results": {"post1": video, "post2": dict(video, title="Other Video")}})
+    )
+
+    result = openai_service.format_json_responses({"post1": "first answer", "post2": "second answer"})
+
+    assert list(result) == ["post1", "post2"]
+    assert result["post2"]["title"] == "Other Video"
+    mock_openai.chat.completions.create.assert_called_once()
+
+def test_format_json_responses_splits_and_skips_local(openai_service, mock_openai):
+    """Test long prompts are split and confident responses never reach GPT."""
+    video = {"title": "Test Video", "channel": "", "channelLink": "", "url": ""}
+    mock_openai.chat.completions.create.side_effect = lambda **kwargs: _completion(
+        json.dumps({"results": {key: video for key in json.loads(kwargs["messages"][1]["content"])}})
+    )
+    local = '{"title": "Local", "channel": "Channel", "url": "https://youtu.be/abcdef123"}'
+
+    result = openai_service.format_json_responses({"a": "x" * 60, "b": "y" * 60, "c": local}, max_chars=100)
+
+    assert result["c"]["title"] == "Local"
+    assert result["a"]["title"] == result["b"]["title"] == "Test Video"
+    assert mock_openai.chat.completions.create.call_count == 2
+
+def test_format_json_responses_retries_invalid(openai_service, mock_openai):
+    """Test items failing validation are retried individually."""
+    video = {"title": "Test Video", "channel": "Test Channel", "channelLink": "", "url": ""}
+    mock_openai.chat.completions.create.side_effect = [
+        _completion(json.dumps({"results": {"post1": video, "post2": {"title": 42}}})),
+        _completion(json.dumps(dict(video, title="Retried Video")))
+    ]
+
+    result = openai_service.format_json_responses({"post1": "first answer", "post2": "second answer"})
+
+    assert result["post1"]["title"] == "Test Video"
+    assert result["post2"]["title"] == "Retried Video"
+    assert mock_openai.chat.completions.create.call_count == 2
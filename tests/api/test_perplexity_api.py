@@ -0,0 +1,118 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+import httpx
+from src.api.perplexity_api import perplexity_search, perplexity_search_async, perplexity_search_batch
+from src.utils.response_parser import VIDEO_INFO_SCHEMA
+
+def _response(content):
+    response = MagicMock()
+    response.status_code = 200
+    response.text = content
+    response.json.return_value = {"choices": [{"message": {"content": content}}]}
+    return response
+
+def test_perplexity_search_plain(mock_requests):
+    """Test free text responses are returned as is."""
+    mock_requests.post.return_value = _response("The podcast is on YouTube.")
+
+    result = perplexity_search("caption", "Find: {}")
+
+    assert result == {"raw_response": "The podcast is on YouTube."}
+    assert "response_format" not in mock_requests.post.call_args.kwargs["json"]
+
+def test_perplexity_search_structured(mock_requests):
+    """Test schema-valid output is parsed and returned as structured."""
+    video = {"title": "Test Video", "channel": "Test Channel", "channelLink": "", "url": "https://youtu.be/abcdef123"}
+    mock_requests.post.return_value = _response(json.dumps(video))
+
+    result = perplexity_search("caption", "Find: {}", response_schema=VIDEO_INFO_SCHEMA)
+
+    assert result["structured"] == video
+    response_format = mock_requests.post.call_args.kwargs["json"]["response_format"]
+    assert response_format == {"type": "json_schema", "json_schema": {"schema": VIDEO_INFO_SCHEMA}}
+
+def test_perplexity_search_structured_invalid(mock_requests):
+    """Test output that fails validation is left for reformatting."""
+    mock_requests.post.return_value = _response('{"title": "Test Video"}')
+
+    result = perplexity_search("caption", "Find: {}", response_schema=VIDEO_INFO_SCHEMA)
+
+    assert "structured" not in result
+    assert result["raw_response"] == '{"title": "Test Video"}'
+
+BATCH_PROMPT = "Captions: {}"
+
+def test_perplexity_search_batch(mock_requests):
+    """Test inputs are resolved in one request keyed by ID."""
+    video = {"title": "Test Video", "channel": "Test Channel", "channelLink": "", "url": ""}
+    mock_requests.post.return_value = _response(json.dumps({"results": [
+        dict(video, id="post1"), dict(video, id="post2", title="Other Video")
+    ]}))
+
+    results = perplexity_search_batch({"post1": "first", "post2": "second"}, BATCH_PROMPT, "Find: {}", VIDEO_INFO_SCHEMA)
+
+    assert mock_requests.post.call_count == 1
+    assert results["post1"]["structured"] == video
+    assert results["post2"]["structured"]["title"] == "Other Video"
+
+def test_perplexity_search_batch_empty_input(mock_requests):
+    """Test empty inputs are not sent and get the missing input error."""
+    video = {"title": "Test Video", "channel": "Test Channel", "channelLink": "", "url": ""}
+    mock_requests.post.return_value = _response(json.dumps({"results": [dict(video, id="post1")]}))
+
+    results = perplexity_search_batch({"post1": "first", "post2": "", "post3": None}, BATCH_PROMPT, "Find: {}", VIDEO_INFO_SCHEMA)
+
+    assert mock_requests.post.call_count == 1
+    assert json.loads(mock_requests.post.call_args.kwargs["json"]["messages"][1]["content"][len("Captions: "):]) == {"post1": "first"}
+    assert results["post1"]["structured"] == video
+    assert results["post2"]["error"] == results["post3"]["error"] == "Missing required input"
+
+def test_perplexity_search_batch_retries_malformed(mock_requests):
+    """Test malformed or missing items fall back to per-item requests."""
+    video = {"title": "Test Video", "channel": "Test Channel", "channelLink": "", "url": ""}
+    mock_requests.post.side_effect = [
+        _response(json.dumps({"results": [dict(video, id="post1"), {"id": "post2", "title": 5}]})),
+        _response(json.dumps(dict(video, title="Retried Video")))
+    ]
+
+    results = perplexity_search_batch({"post1": "first", "post2": "second"}, BATCH_PROMPT, "Find: {}", VIDEO_INFO_SCHEMA)
+
+    assert results["post2"]["structured"]["title"] == "Retried Video"
+    assert mock_requests.post.call_args.kwargs["json"]["messages"][1]["content"] == "Find: second"
+
+def test_perplexity_search_batch_token_budget(mock_requests):
+    """Test inputs are split into several requests by the token budget."""
+    mock_requests.post.side_effect = lambda *args, **kwargs: _response(json.dumps({"results": [
+        {"id": key, "title": "", "channel": "", "channelLink": "", "url": ""}
+        for key in json.loads(kwargs["json"]["messages"][1]["content"][len("Captions: "):])
+    ]}))
+
+    results = perplexity_search_batch({f"post{i}": "x" * 400 for i in range(4)}, BATCH_PROMPT, "Find: {}",
+                                      VIDEO_INFO_SCHEMA, max_tokens=250)
+
+    assert mock_requests.post.call_count == 2
+    assert list(results) == [f"post{i}" for i in range(4)]
+
+def test_perplexity_search_async_structured(mock_async_http):
+    """Test the async search parses schema-valid output."""
+    video = {"title": "Test Video", "channel": "Test Channel", "channelLink": "", "url": ""}
+    mock_async_http.side_effect = lambda request: httpx.Response(
+        200, json={"choices": [{"message": {"content": json.dumps(video)}}]}
+    )
+
+    result = asyncio.run(perplexity_search_async("caption", "Find: {}", response_schema=VIDEO_INFO_SCHEMA))
+
+    assert result["structured"] == video
+    request = mock_async_http.call_args[0][0]
+    assert json.loads(request.content)["messages"][1]["content"] == "Find: caption"
+
+def test_perplexity_search_async_timeout(mock_async_http):
+    """Test async timeouts are reported like the sync ones."""
+    def timeout(request):
+        raise httpx.ReadTimeout("timed out", request=request)
+    mock_async_http.side_effect = timeout
+
+    result = asyncio.run(perplexity_search_async("caption", "Find: {}"))
+
+    assert result["error"] == "API timeout"
@@ -29,14 +29,28 @@ def sample_video_file():
 
 @pytest.fixture
 def mock_requests(monkeypatch):
-    """Mock requests library for testing."""
+    """Mock requests library and the shared HTTP session for testing."""
+    from src.api.http_client import get_session
     mock = MagicMock()
     mock.post.return_value.status_code = 200
     mock.post.return_value.json.return_value = {"success": True}
     monkeypatch.setattr("requests.post", mock.post)
     monkeypatch.setattr("requests.get", mock.get)
+    monkeypatch.setattr(get_session(), "post", mock.post)
+    monkeypatch.setattr(get_session(), "get", mock.get)
     return mock
 
+@pytest.fixture
+def mock_async_http(monkeypatch):
+    """Route the shared async HTTP client through a mock transport; set `side_effect` to answer requests."""
+    import httpx
+    from src.api import http_client
+    handler = MagicMock()
+    monkeypatch.setattr(http_client, "create_async_client", lambda *args, **kwargs: httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: handler(request)), follow_redirects=True
+    ))
+    return handler
+
 @pytest.fixture
 def sample_instagram_post():
     """Sample Instagram post data for testing."""
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 from src.services.analysis_service import analyze_selected_posts
 
 @pytest.fixture
@@ -8,13 +8,22 @@ def mock_services():
     with patch('src.services.analysis_service.perplexity_search') as mock_perplexity, \
          patch('src.services.analysis_service.openai_service') as mock_openai, \
          patch('src.services.analysis_service.gemini_process_video') as mock_gemini, \
-         patch('src.services.analysis_service.download_video') as mock_download:
-        yield {
-            'perplexity': mock_perplexity,
-            'openai': mock_openai,
-            'gemini': mock_gemini,
-            'download': mock_download
+         patch('src.services.video_service.download_video') as mock_download, \
+         patch('src.services.analysis_service.shared_downloads.cache', None), \
+         patch('src.services.audio_service.ffmpeg_available', return_value=False), \
+         patch('src.services.analysis_service.CAPTION_BATCH_ENABLED', False):
+        # Batch formatting delegates to the per-response mock so tests can set one return value
+        mock_openai.format_json_responses.side_effect = lambda raws: {
+            key: mock_openai.format_json_response(raw) for key, raw in raws.items()
         }
+        with patch('src.services.transcription_service.openai_service', mock_openai), \
+             patch('src.services.transcription_service.transcript_cache', None):
+            yield {
+                'perplexity': mock_perplexity,
+                'openai': mock_openai,
+                'gemini': mock_gemini,
+                'download': mock_download
+            }
 
 def test_analyze_caption(mock_services, sample_instagram_post):
     """Test caption analysis method."""
@@ -36,7 +45,36 @@ def test_analyze_caption(mock_services, sample_instagram_post):
     assert results[0]["post_id"] == sample_instagram_post['id']
     assert "title" in results[0]["raw_response"]
     mock_services['perplexity'].assert_called_once()
-    mock_services['openai'].format_json_response.assert_called_once()
+    mock_services['openai'].format_json_responses.assert_called_once()
+
+def test_analyze_caption_structured(mock_services, sample_instagram_post):
+    """Test schema-valid Perplexity output skips GPT formatting."""
+    video = {"title": "Test Video", "channel": "Test Channel", "channelLink": "", "url": ""}
+    mock_services['perplexity'].return_value = {"raw_response": "{}", "structured": video}
+
+    results = analyze_selected_posts([sample_instagram_post], [sample_instagram_post['id']], "Caption")
+
+    assert results[0]["raw_response"] == video
+    mock_services['openai'].format_json_responses.assert_not_called()
+
+def test_analyze_caption_batched(mock_services):
+    """Test captions are resolved through one batched search when enabled."""
+    posts = [{"id": "post1", "caption": "first"}, {"id": "post2", "caption": "second"}]
+    video = {"title": "Test Video", "channel": "Test Channel", "channelLink": "", "url": ""}
+    mock_services['openai'].format_json_response.return_value = {"title": "Formatted"}
+
+    with patch('src.services.analysis_service.CAPTION_BATCH_ENABLED', True), \
+         patch('src.services.analysis_service.perplexity_search_batch') as mock_batch:
+        mock_batch.return_value = {
+            "post1": {"raw_response": "{}", "structured": video},
+            "post2": {"raw_response": "free text"}
+        }
+        results = analyze_selected_posts(posts, ["post1", "post2"], "Caption")
+
+    assert mock_batch.call_args[0][0] == {"post1": "first", "post2": "second"}
+    assert results[0]["raw_response"] == video
+    assert results[1]["raw_response"]["title"] == "Formatted"
+    mock_services['perplexity'].assert_not_called()
 
 def test_analyze_transcription(mock_services, sample_instagram_post):
     """Test transcription analysis method."""
@@ -111,4 +149,168 @@ def test_analyze_service_error(mock_services, sample_instagram_post):
     
     assert len(results) == 1
     assert results[0]["post_id"] == sample_instagram_post['id']
-    assert "error" in results[0]["raw_response"] 
\ No newline at end of file
+    assert "error" in results[0]["raw_response"]
+
+def test_analyze_preserves_post_order(mock_services):
+    """Test concurrent analysis returns results in post order."""
+    import time
+    posts = [{"id": f"post{i}", "caption": f"caption {i}"} for i in range(6)]
+
+    def slow_search(caption, prompt, **kwargs):
+        # Finish later posts first to scramble completion order
+        time.sleep(0.01 * (6 - int(caption.split()[-1])))
+        return {"raw_response": caption}
+
+    mock_services['perplexity'].side_effect = slow_search
+    mock_services['openai'].format_json_response.side_effect = lambda raw: {"title": raw}
+
+    results = analyze_selected_posts(posts, [p['id'] for p in posts], "Caption", max_workers=3)
+
+    assert [r["post_id"] for r in results] == [p['id'] for p in posts]
+
+def test_analyze_formats_in_one_batch(mock_services):
+    """Test raw results of all posts are formatted together."""
+    posts = [{"id": f"post{i}", "caption": f"caption {i}"} for i in range(3)]
+    mock_services['perplexity'].side_effect = lambda caption, prompt, **kwargs: {"raw_response": caption}
+    mock_services['openai'].format_json_response.return_value = {"title": "Test Video"}
+
+    results = analyze_selected_posts(posts, [p['id'] for p in posts], "Caption", max_workers=3)
+
+    mock_services['openai'].format_json_responses.assert_called_once()
+    raws = mock_services['openai'].format_json_responses.call_args[0][0]
+    assert len(raws) == 3
+    assert all(r["raw_response"]["title"] == "Test Video" for r in results)
+
+def test_analyze_failure_isolated(mock_services):
+    """Test one failing post does not affect the others."""
+    posts = [{"id": "ok1", "caption": "fine"}, {"id": "bad", "caption": "boom"}, {"id": "ok2", "caption": "fine"}]
+
+    def search(caption, prompt, **kwargs):
+        if caption == "boom":
+            raise Exception("Service error")
+        return {"raw_response": caption}
+
+    mock_services['perplexity'].side_effect = search
+    mock_services['openai'].format_json_response.return_value = {"title": "Test Video"}
+
+    results = analyze_selected_posts(posts, ["ok1", "bad", "ok2"], "Caption", max_workers=3)
+
+    assert [r["post_id"] for r in results] == ["ok1", "bad", "ok2"]
+    assert "error" in results[1]["raw_response"]
+    assert results[0]["raw_response"]["title"] == "Test Video"
+    assert results[2]["raw_response"]["title"] == "Test Video"
+
+def test_analyze_batch_timeout(mock_services):
+    """Test posts that outlive the batch timeout get an error entry."""
+    import threading
+    release = threading.Event()
+    posts = [{"id": "slow", "caption": "slow"}, {"id": "fast", "caption": "fast"}]
+
+    def search(caption, prompt, **kwargs):
+        if caption == "slow":
+            release.wait(5)
+        return {"raw_response": caption}
+
+    mock_services['perplexity'].side_effect = search
+    mock_services['openai'].format_json_response.return_value = {"title": "Test Video"}
+
+    try:
+        results = analyze_selected_posts(posts, ["slow", "fast"], "Caption", max_workers=2, timeout=0.2)
+    finally:
+        release.set()
+
+    assert [r["post_id"] for r in results] == ["slow", "fast"]
+    assert "timed out" in results[0]["raw_response"]["error"]
+    assert results[1]["raw_response"]["title"] == "Test Video"
+
+def test_analyze_batch_timeout_queued_posts(mock_services):
+    """Test posts still queued at the deadline get the timeout error."""
+    import threading
+    release = threading.Event()
+    posts = [{"id": "slow", "caption": "slow"}, {"id": "queued", "caption": "queued"}]
+
+    def search(caption, prompt, **kwargs):
+        release.wait(5)
+        return {"raw_response": caption}
+
+    mock_services['perplexity'].side_effect = search
+
+    try:
+        results = analyze_selected_posts(posts, ["slow", "queued"], "Caption", max_workers=1, timeout=0.2)
+    finally:
+        release.set()
+
+    assert [r["post_id"] for r in results] == ["slow", "queued"]
+    assert all("timed out after 0.2 seconds" in r["raw_response"]["error"] for r in results)
+
+def test_analyze_caption_batched_timeout(mock_services):
+    """Test batched caption analysis honours the batch timeout."""
+    import threading
+    release = threading.Event()
+    posts = [{"id": "post1", "caption": "first"}, {"id": "post2", "caption": "second"}]
+
+    with patch('src.services.analysis_service.CAPTION_BATCH_ENABLED', True), \
+         patch('src.services.analysis_service.perplexity_search_batch', side_effect=lambda *args: release.wait(5) and {}):
+        try:
+            results = analyze_selected_posts(posts, ["post1", "post2"], "Caption", timeout=0.2)
+        finally:
+            release.set()
+
+    assert [r["post_id"] for r in results] == ["post1", "post2"]
+    assert all("timed out" in r["raw_response"]["error"] for r in results)
+
+def test_progressive_transcription_preview_enough(mock_services, sample_instagram_post):
+    """Test the full audio is not transcribed when the preview finds a video."""
+    mock_services['download'].return_value = ("test_path", None)
+    mock_services['perplexity'].return_value = {"raw_response": "https://www.youtube.com/watch?v=abcdef123"}
+    mock_services['openai'].format_json_response.return_value = {"url": "https://www.youtube.com/watch?v=abcdef123"}
+
+    with patch('src.services.analysis_service.transcribe_video_preview', return_value=("intro", False)), \
+         patch('src.services.analysis_service.transcribe_video') as mock_full:
+        results = analyze_selected_posts([sample_instagram_post], [sample_instagram_post['id']], "Transcription")
+
+    assert results[0]["raw_response"]["url"] == "https://www.youtube.com/watch?v=abcdef123"
+    mock_full.assert_not_called()
+    mock_services['perplexity'].assert_called_once_with("intro", ANY, response_schema=ANY)
+
+def test_progressive_transcription_escalates(mock_services, sample_instagram_post):
+    """Test the rest of the audio is transcribed when the preview lookup comes back empty."""
+    mock_services['download'].return_value = ("test_path", None)
+    mock_services['perplexity'].side_effect = [
+        {"raw_response": "I could not find this podcast"},
+        {"raw_response": "https://youtu.be/abcdef123"}
+    ]
+    mock_services['openai'].format_json_response.return_value = {"url": "https://youtu.be/abcdef123"}
+
+    with patch('src.services.analysis_service.transcribe_video_preview', return_value=("intro", False)), \
+         patch('src.services.analysis_service.transcribe_video_remainder', return_value="the rest") as mock_rest, \
+         patch('src.services.analysis_service.transcribe_video') as mock_full:
+        analyze_selected_posts([sample_instagram_post], [sample_instagram_post['id']], "Transcription")
+
+    mock_rest.assert_called_once_with("test_path")
+    mock_full.assert_not_called()
+    assert mock_services['perplexity'].call_args_list[1][0][0] == "intro the rest"
+
+def test_progressive_transcription_remainder_failure(mock_services, sample_instagram_post):
+    """Test the full audio is transcribed when the remainder can't be."""
+    mock_services['download'].return_value = ("test_path", None)
+    mock_services['perplexity'].return_value = {"raw_response": "not found"}
+
+    with patch('src.services.analysis_service.transcribe_video_preview', return_value=("intro", False)), \
+         patch('src.services.analysis_service.transcribe_video_remainder', return_value=None), \
+         patch('src.services.analysis_service.transcribe_video', return_value="full transcript") as mock_full:
+        analyze_selected_posts([sample_instagram_post], [sample_instagram_post['id']], "Transcription")
+
+    mock_full.assert_called_once_with("test_path")
+    assert mock_services['perplexity'].call_args_list[1][0][0] == "full transcript"
+
+def test_progressive_transcription_short_clip(mock_services, sample_instagram_post):
+    """Test clips shorter than the preview window are never escalated."""
+    mock_services['download'].return_value = ("test_path", None)
+    mock_services['perplexity'].return_value = {"raw_response": "not found"}
+
+    with patch('src.services.analysis_service.transcribe_video_preview', return_value=("whole clip", True)), \
+         patch('src.services.analysis_service.transcribe_video') as mock_full:
+        analyze_selected_posts([sample_instagram_post], [sample_instagram_post['id']], "Transcription")
+
+    mock_full.assert_not_called()
@@ -0,0 +1,133 @@
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+from src.services.audio_service import audio_track, extract_audio
+
+@pytest.fixture
+def fake_ffmpeg():
+    """Pretend ffmpeg is installed and writes a small audio file."""
+    def run(command, **kwargs):
+        with open(command[-1], "wb") as f:
+            f.write(b"audio")
+        return MagicMock(returncode=0, stderr="")
+
+    with patch('src.services.audio_service.shutil.which', return_value="/usr/bin/ffmpeg"), \
+         patch('src.services.audio_service.subprocess.run', side_effect=run) as mock_run:
+        yield mock_run
+
+def test_extract_audio(fake_ffmpeg, sample_video_file, tmp_path):
+    """Test a mono low-bitrate track is extracted."""
+    output = str(tmp_path / "audio.mp3")
+
+    audio_path, error = extract_audio(sample_video_file, output)
+
+    assert error is None
+    assert audio_path == output
+    assert os.path.exists(output)
+    command = fake_ffmpeg.call_args[0][0]
+    assert "-vn" in command
+    assert command[command.index("-ac") + 1] == "1"
+
+def test_extract_audio_unique_temp_files(fake_ffmpeg, sample_video_file, tmp_path):
+    """Test concurrent extractions of the same video never share a temporary file."""
+    output = str(tmp_path / "audio.mp3")
+
+    extract_audio(sample_video_file, output)
+    extract_audio(sample_video_file, output)
+
+    first, second = (call[0][0][-1] for call in fake_ffmpeg.call_args_list)
+    assert first != second
+    assert os.path.dirname(first) == str(tmp_path)
+    assert os.listdir(tmp_path) == ["audio.mp3"]
+
+def test_extract_audio_failure(sample_video_file, tmp_path):
+    """Test ffmpeg errors are reported and leave no file behind."""
+    output = str(tmp_path / "audio.mp3")
+    with patch('src.services.audio_service.shutil.which', return_value="/usr/bin/ffmpeg"), \
+         patch('src.services.audio_service.subprocess.run', return_value=MagicMock(returncode=1, stderr="Invalid data")):
+        audio_path, error = extract_audio(sample_video_file, output)
+
+    assert audio_path is None
+    assert "Invalid data" in error
+    assert os.listdir(tmp_path) == []
+
+def test_audio_track_cached(fake_ffmpeg, sample_video_file, tmp_path):
+    """Test the extracted track is reused for the same video."""
+    cache_dir = str(tmp_path / "audio")
+
+    with audio_track(sample_video_file, cache_dir=cache_dir, use_cache=True) as first:
+        pass
+    with audio_track(sample_video_file, cache_dir=cache_dir, use_cache=True) as second:
+        pass
+
+    assert first == second
+    assert os.path.exists(first)
+    assert fake_ffmpeg.call_count == 1
+
+def test_audio_track_temporary(fake_ffmpeg, sample_video_file):
+    """Test an uncached track is removed after use."""
+    with audio_track(sample_video_file, use_cache=False) as audio_path:
+        assert os.path.exists(audio_path)
+
+    assert not os.path.exists(audio_path)
+
+def test_audio_track_without_ffmpeg(sample_video_file):
+    """Test the video is used directly when ffmpeg is missing."""
+    with patch('src.services.audio_service.shutil.which', return_value=None):
+        with audio_track(sample_video_file) as audio_path:
+            assert audio_path == sample_video_file
+
+def test_plan_segments_short_audio():
+    """Test audio within the limit stays a single segment."""
+    from src.services.audio_service import plan_segments
+
+    assert plan_segments(100.0, [], 600) == [(0.0, 100.0)]
+
+def test_plan_segments_cuts_on_silence():
+    """Test cuts are placed in the latest silence inside each window."""
+    from src.services.audio_service import plan_segments
+
+    segments = plan_segments(1500.0, [(200.0, 202.0), (540.0, 542.0), (1000.0, 1010.0)], 600)
+
+    assert segments == [(0.0, 541.0), (541.0, 1005.0), (1005.0, 1500.0)]
+
+def test_plan_segments_hard_cut_without_silence():
+    """Test segments are cut at the limit when there is no usable silence."""
+    from src.services.audio_service import plan_segments
+
+    assert plan_segments(1300.0, [(10.0, 12.0)], 600) == [(0.0, 600.0), (600.0, 1200.0), (1200.0, 1300.0)]
+
+def test_analyze_silence_parses_ffmpeg_output():
+    """Test duration and silences are read from silencedetect output."""
+    from src.services.audio_service import analyze_silence
+    stderr = (
+        "  Duration: 00:01:05.50, start: 0.000000, bitrate: 32 kb/s\n"
+        "[silencedetect @ 0x1] silence_start: -0.01\n"
+        "[silencedetect @ 0x1] silence_end: 3.2 | silence_duration: 3.21\n"
+        "[silencedetect @ 0x1] silence_start: 60.5\n"
+    )
+    with patch('src.services.audio_service.subprocess.run', return_value=MagicMock(returncode=0, stderr=stderr)):
+        duration, silences = analyze_silence("audio.mp3")
+
+    assert duration == 65.5
+    assert silences == [(0.0, 3.2), (60.5, 65.5)]
+
+def test_speech_spans_removes_long_silences():
+    """Test long silences are removed with padding and short pauses kept."""
+    from src.services.audio_service import speech_spans
+
+    spans = speech_spans(60.0, [(0.0, 10.0), (20.0, 20.5), (30.0, 40.0), (55.0, 60.0)], min_silence=1.0, padding=0.25)
+
+    assert spans == [(9.75, 30.25), (39.75, 55.25)]
+
+def test_timestamp_map_to_original():
+    """Test trimmed times map back to the original timeline."""
+    from src.services.audio_service import TimestampMap
+
+    timestamp_map = TimestampMap([(10.0, 20.0), (30.0, 40.0)])
+
+    assert timestamp_map.duration == 20.0
+    assert timestamp_map.to_original(0.0) == 10.0
+    assert timestamp_map.to_original(5.0) == 15.0
+    assert timestamp_map.to_original(12.0) == 32.0
+    assert timestamp_map.to_original(20.0) == 40.0
@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import patch
+from src.services.natural_agent_service import NaturalAgentService
+
+INITIAL_RESULTS = [{"id": "1", "title": "Sleep Science Explained"}]
+
+UNSATISFIED = {
+    "satisfied": False,
+    "reason": "Results lack variety",
+    "suggested_queries": ["better query 1", "better query 2"]
+}
+
+@pytest.fixture
+def mock_apify_service():
+    with patch('src.services.natural_agent_service.apify_service') as mock:
+        yield mock
+
+@pytest.fixture
+def agent(mock_env):
+    return NaturalAgentService()
+
+def test_refine_only_searches_alternative_queries(agent, mock_apify_service):
+    """Test refinement reuses the given results and evaluation and dedups new results."""
+    mock_apify_service.search_youtube_podcasts_multi.return_value = {
+        "better query 1": [{"id": "2"}, {"id": "3"}],
+        "better query 2": [{"id": "3"}, {"id": "4"}],
+    }
+
+    with patch.object(agent, 'evaluate_results') as evaluate:
+        results = agent.refine("sleep", INITIAL_RESULTS, UNSATISFIED, max_results=10)
+
+    evaluate.assert_not_called()
+    mock_apify_service.search_youtube_podcasts.assert_not_called()
+    mock_apify_service.search_youtube_podcasts_multi.assert_called_once_with(UNSATISFIED["suggested_queries"], 10)
+    assert [result["id"] for result in results] == ["2", "3", "4"]
+
+def test_refine_falls_back_to_initial_results(agent, mock_apify_service):
+    """Test the initial results are kept when the alternative queries find nothing."""
+    mock_apify_service.search_youtube_podcasts_multi.return_value = {}
+
+    assert agent.refine("sleep", INITIAL_RESULTS, UNSATISFIED) == INITIAL_RESULTS
@@ -0,0 +1,164 @@
+import pytest
+from unittest.mock import patch
+from src.services.transcription_service import transcribe_segments
+
+@pytest.fixture
+def mock_openai():
+    with patch('src.services.transcription_service.openai_service') as mock:
+        yield mock
+
+def test_transcribe_short_audio_single_request(mock_openai):
+    """Test short audio is sent to Whisper in one request."""
+    mock_openai.transcribe_audio.return_value = "hello world"
+
+    with patch('src.services.transcription_service.analyze_silence', return_value=(30.0, [])):
+        segments, _ = transcribe_segments("audio.mp3", max_segment_seconds=600)
+
+    assert segments == [{"start": 0.0, "end": 30.0, "text": "hello world"}]
+    mock_openai.transcribe_audio.assert_called_once_with("audio.mp3", raise_on_error=True)
+
+def test_transcribe_long_audio_in_order(mock_openai):
+    """Test long audio is split, transcribed concurrently and stitched in order."""
+    import time
+
+    def transcribe(path, raise_on_error=False):
+        index = int(path[-8:-4])
+        # Later segments finish first
+        time.sleep(0.01 * (3 - index))
+        return f"part {index}"
+
+    mock_openai.transcribe_audio.side_effect = transcribe
+
+    with patch('src.services.transcription_service.analyze_silence', return_value=(25.0, [])), \
+         patch('src.services.transcription_service.cut_audio', side_effect=lambda path, start, end, out: out):
+        segments, _ = transcribe_segments("audio.mp3", max_segment_seconds=10, max_workers=3)
+
+    assert [s["text"] for s in segments] == ["part 0", "part 1", "part 2"]
+    assert [(s["start"], s["end"]) for s in segments] == [(0.0, 10.0), (10.0, 20.0), (20.0, 25.0)]
+
+def test_transcribe_skips_failed_segment(mock_openai):
+    """Test a failed segment is dropped while the rest are kept."""
+    def transcribe(path, raise_on_error=False):
+        if path.endswith("0001.mp3"):
+            raise Exception("API Error")
+        return "ok"
+
+    mock_openai.transcribe_audio.side_effect = transcribe
+
+    with patch('src.services.transcription_service.analyze_silence', return_value=(25.0, [])), \
+         patch('src.services.transcription_service.cut_audio', side_effect=lambda path, start, end, out: out):
+        segments, complete = transcribe_segments("audio.mp3", max_segment_seconds=10)
+
+    assert [s["start"] for s in segments] == [0.0, 20.0]
+    assert complete is False
+
+def test_transcribe_trims_silence(mock_openai):
+    """Test long silences are trimmed and offsets mapped back to the original audio."""
+    mock_openai.transcribe_audio.return_value = "speech"
+    silence_results = iter([(100.0, [(0.0, 40.0)]), (60.25, [])])
+
+    with patch('src.services.transcription_service.analyze_silence', side_effect=lambda path: next(silence_results)), \
+         patch('src.services.transcription_service.trim_audio', side_effect=lambda path, spans, out: out) as mock_trim:
+        segments, _ = transcribe_segments("audio.mp3", max_segment_seconds=600, trim_silence=True)
+
+    assert mock_trim.call_args[0][1] == [(39.75, 100.0)]
+    assert segments == [{"start": 39.75, "end": 100.0, "text": "speech"}]
+
+def test_transcribe_without_trimming(mock_openai):
+    """Test trimming can be turned off."""
+    mock_openai.transcribe_audio.return_value = "speech"
+
+    with patch('src.services.transcription_service.analyze_silence', return_value=(100.0, [(0.0, 40.0)])), \
+         patch('src.services.transcription_service.trim_audio') as mock_trim:
+        segments, _ = transcribe_segments("audio.mp3", trim_silence=False)
+
+    mock_trim.assert_not_called()
+    assert segments[0]["start"] == 0.0
+
+def test_transcribe_video_uses_transcript_cache(mock_openai, sample_video_file, tmp_path):
+    """Test the same audio is only transcribed once."""
+    from src.services.transcription_service import transcribe_video
+    from src.utils.json_cache import JsonDirectoryCache
+    mock_openai.transcribe_audio.return_value = "hello world"
+    cache = JsonDirectoryCache(str(tmp_path / "transcripts"))
+
+    with patch('src.services.transcription_service.transcript_cache', cache), \
+         patch('src.services.audio_service.ffmpeg_available', return_value=False):
+        first = transcribe_video(sample_video_file)
+        second = transcribe_video(sample_video_file)
+
+    assert first == second == "hello world"
+    mock_openai.transcribe_audio.assert_called_once()
+
+def test_transcribe_video_failure_not_cached(mock_openai, sample_video_file, tmp_path):
+    """Test failed transcriptions are not cached."""
+    from src.services.transcription_service import transcribe_video
+    from src.utils.json_cache import JsonDirectoryCache
+    mock_openai.transcribe_audio.side_effect = [Exception("API Error"), "hello world"]
+    cache = JsonDirectoryCache(str(tmp_path / "transcripts"))
+
+    with patch('src.services.transcription_service.transcript_cache', cache), \
+         patch('src.services.audio_service.ffmpeg_available', return_value=False):
+        first = transcribe_video(sample_video_file)
+        second = transcribe_video(sample_video_file)
+
+    assert "Transcription failed" in first
+    assert second == "hello world"
+
+def test_transcribe_video_partial_not_cached(mock_openai, sample_video_file):
+    """Test transcripts missing a failed segment are returned but not cached."""
+    from src.services.transcription_service import transcribe_video
+
+    with patch('src.services.transcription_service.transcript_cache') as cache, \
+         patch('src.services.transcription_service.audio_track') as mock_track, \
+         patch('src.services.transcription_service.file_sha256', return_value="hash"), \
+         patch('src.services.transcription_service.transcribe_segments') as mock_segments:
+        cache.get.return_value = None
+        mock_track.return_value.__enter__.return_value = "audio.mp3"
+        mock_segments.return_value = ([{"start": 0.0, "end": 10.0, "text": "part one"},
+                                       {"start": 20.0, "end": 25.0, "text": "part three"}], False)
+        transcript = transcribe_video(sample_video_file)
+
+    assert transcript == "part one part three"
+    cache.set.assert_not_called()
+
+def test_transcribe_video_preview(mock_openai, sample_video_file):
+    """Test only the leading window of speech is transcribed, after a silent intro is trimmed."""
+    from src.services.transcription_service import transcribe_video_preview
+    mock_openai.transcribe_audio.return_value = "welcome to the show"
+    silence_results = iter([(300.0, [(0.0, 40.0)]), (260.25, [])])
+
+    with patch('src.services.transcription_service.audio_track') as mock_track, \
+         patch('src.services.transcription_service.transcript_cache', None), \
+         patch('src.services.transcription_service.TRANSCRIPTION_TRIM_SILENCE', True), \
+         patch('src.services.transcription_service.analyze_silence', side_effect=lambda path: next(silence_results)), \
+         patch('src.services.transcription_service.trim_audio', side_effect=lambda path, spans, out: out), \
+         patch('src.services.transcription_service.cut_audio', side_effect=lambda path, start, end, out: out) as mock_cut:
+        mock_track.return_value.__enter__.return_value = "audio.mp3"
+        transcript, covers_whole = transcribe_video_preview(sample_video_file, seconds=60)
+
+    assert transcript == "welcome to the show"
+    assert covers_whole is False
+    assert mock_cut.call_args[0][0].endswith("trimmed.mp3")
+    assert mock_cut.call_args[0][1:3] == (0.0, 60.0)
+
+def test_transcribe_segments_after_offset(mock_openai):
+    """Test only the audio after the offset is transcribed, with times on the original timeline."""
+    mock_openai.transcribe_audio.return_value = "the rest"
+
+    with patch('src.services.transcription_service.analyze_silence', return_value=(25.0, [(5.0, 12.0)])), \
+         patch('src.services.transcription_service.cut_audio', side_effect=lambda path, start, end, out: out) as mock_cut:
+        segments, complete = transcribe_segments("audio.mp3", trim_silence=False, offset=10.0)
+
+    assert mock_cut.call_args[0][1:3] == (10.0, 25.0)
+    assert segments == [{"start": 10.0, "end": 25.0, "text": "the rest"}]
+    assert complete is True
+
+def test_transcribe_video_preview_without_ffmpeg(mock_openai, sample_video_file):
+    """Test previews are skipped when the audio can't be cut."""
+    from src.services.transcription_service import transcribe_video_preview
+
+    with patch('src.services.audio_service.ffmpeg_available', return_value=False):
+        assert transcribe_video_preview(sample_video_file) == (None, False)
+
+    mock_openai.transcribe_audio.assert_not_called()
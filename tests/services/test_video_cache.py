@@ -0,0 +1,138 @@
+import os
+import pytest
+from unittest.mock import patch
+from src.services.video_cache import VideoCache, canonical_video_url
+from src.services.video_service import SharedVideoDownloads
+
+@pytest.fixture
+def cache(tmp_path):
+    """VideoCache rooted in a temporary directory."""
+    return VideoCache(cache_dir=str(tmp_path / "videos"), max_bytes=1024)
+
+def write_download(cache, content):
+    """Simulate a finished download inside the cache's download dir."""
+    path = os.path.join(cache.download_dir(), f"download-{len(os.listdir(cache.download_dir()))}.mp4")
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+def test_canonical_url_instagram_cdn():
+    """Test the same Instagram video maps to one key across edge hosts."""
+    first = "https://scontent-lax3-1.cdninstagram.com/o1/v/t16/abc.mp4?oe=1&oh=x"
+    second = "https://scontent-iad3-2.cdninstagram.com/o1/v/t16/abc.mp4?oe=2&oh=y"
+    assert canonical_video_url(first) == canonical_video_url(second)
+
+def test_canonical_url_sorts_query():
+    """Test query parameter order does not change the key."""
+    assert canonical_video_url("https://Example.com/v?b=2&a=1#t") == canonical_video_url("https://example.com/v?a=1&b=2")
+
+def test_put_and_get(cache):
+    """Test a cached video is returned for its URL."""
+    url = "https://example.com/video.mp4"
+    assert cache.get(url) is None
+
+    cached_path = cache.put(url, write_download(cache, b"video bytes"))
+
+    assert cache.get(url) == cached_path
+    with open(cached_path, "rb") as f:
+        assert f.read() == b"video bytes"
+
+def test_same_content_stored_once(cache):
+    """Test identical videos under different URLs share one blob."""
+    first = cache.put("https://example.com/a.mp4", write_download(cache, b"same"))
+    second = cache.put("https://example.com/b.mp4", write_download(cache, b"same"))
+
+    assert first == second
+    assert len(os.listdir(cache.blob_dir)) == 1
+
+def test_lru_eviction(cache):
+    """Test least recently used videos are evicted past the byte budget."""
+    old_path = cache.put("https://example.com/old.mp4", write_download(cache, b"o" * 400))
+    os.utime(old_path, (1, 1))
+    recent_path = cache.put("https://example.com/recent.mp4", write_download(cache, b"r" * 400))
+    os.utime(recent_path, (2, 2))
+    cache.get("https://example.com/old.mp4")
+
+    new_path = cache.put("https://example.com/new.mp4", write_download(cache, b"n" * 400))
+
+    assert os.path.exists(old_path)
+    assert os.path.exists(new_path)
+    assert not os.path.exists(recent_path)
+    assert cache.get("https://example.com/recent.mp4") is None
+
+def test_eviction_keeps_in_use(cache):
+    """Test videos in use are not evicted."""
+    in_use = cache.put("https://example.com/a.mp4", write_download(cache, b"a" * 800))
+    os.utime(in_use, (1, 1))
+
+    cache.put("https://example.com/b.mp4", write_download(cache, b"b" * 800), keep=[in_use])
+
+    assert os.path.exists(in_use)
+
+def test_eviction_skips_leased_videos(cache, tmp_path):
+    """Test a video leased by any process sharing the cache is not evicted."""
+    in_use = cache.put("https://example.com/a.mp4", write_download(cache, b"a" * 800))
+    os.utime(in_use, (1, 1))
+    lease = cache.lease(in_use)
+
+    other_process = VideoCache(cache_dir=cache.cache_dir, max_bytes=1024)
+    other_process.put("https://example.com/b.mp4", write_download(other_process, b"b" * 800))
+    assert os.path.exists(in_use)
+
+    cache.release_lease(lease)
+    other_process.evict()
+    assert not os.path.exists(in_use)
+
+def test_eviction_ignores_stale_leases(cache):
+    """Test leases left by processes that died are removed and don't block eviction."""
+    old = cache.put("https://example.com/a.mp4", write_download(cache, b"a" * 800))
+    os.utime(old, (1, 1))
+    content_hash = os.path.splitext(os.path.basename(old))[0]
+    os.makedirs(cache.lease_dir)
+    open(os.path.join(cache.lease_dir, f"{content_hash}.{2 ** 30}.stale"), "w").close()
+
+    cache.put("https://example.com/b.mp4", write_download(cache, b"b" * 800))
+
+    assert not os.path.exists(old)
+    assert os.listdir(cache.lease_dir) == []
+
+def test_eviction_counts_derived_files(tmp_path):
+    """Test derived files count toward the byte budget and go with their video."""
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    cache = VideoCache(cache_dir=str(tmp_path / "videos"), max_bytes=1024, derived_dirs=(str(audio_dir),))
+    old = cache.put("https://example.com/a.mp4", write_download(cache, b"a" * 300))
+    os.utime(old, (1, 1))
+    audio = audio_dir / f"{os.path.splitext(os.path.basename(old))[0]}.mp3"
+    audio.write_bytes(b"x" * 400)
+    os.utime(audio, (1, 1))
+
+    new = cache.put("https://example.com/b.mp4", write_download(cache, b"b" * 400))
+
+    assert os.path.exists(new)
+    assert not os.path.exists(old)
+    assert not audio.exists()
+
+def test_shared_downloads_use_cache(cache):
+    """Test shared downloads are served from the cache and survive release."""
+    calls = []
+
+    def fake_download(url, dest_dir=None):
+        calls.append(url)
+        path = os.path.join(dest_dir, "download.mp4")
+        with open(path, "wb") as f:
+            f.write(b"video bytes")
+        return path, None
+
+    downloads = SharedVideoDownloads(cache=cache)
+    url = "https://example.com/video.mp4"
+    with patch('src.services.video_service.download_video', side_effect=fake_download):
+        with downloads.video(url) as (first_path, error):
+            assert error is None
+        with downloads.video(url) as (second_path, error):
+            assert error is None
+
+    assert calls == [url]
+    assert first_path == second_path
+    assert os.path.exists(first_path)
+    assert os.listdir(cache.lease_dir) == []
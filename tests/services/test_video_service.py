@@ -43,6 +43,23 @@ def test_download_video_request_error(mock_requests):
     assert "Unexpected error while downloading video" in error
     assert "Network Error" in error
 
+def test_download_video_partial_removed(mock_requests, tmp_path):
+    """Test a download failing mid-stream leaves no partial file behind."""
+    def chunks(chunk_size):
+        yield b"first chunk"
+        raise IOError("Connection reset")
+
+    mock_response = MagicMock()
+    mock_response.headers = {}
+    mock_response.iter_content.side_effect = chunks
+    mock_requests.get.return_value = mock_response
+
+    file_path, error = download_video("https://example.com/video.mp4", dest_dir=str(tmp_path))
+
+    assert file_path is None
+    assert "Connection reset" in error
+    assert os.listdir(tmp_path) == []
+
 def test_download_video_no_content_length(mock_requests):
     """Test video download with no content length header."""
     mock_response = MagicMock()
@@ -68,4 +85,85 @@ def test_download_video_empty_response(mock_requests):
     assert error is None
     assert os.path.exists(file_path)
     assert os.path.getsize(file_path) == 0
-    os.unlink(file_path) 
\ No newline at end of file
+    os.unlink(file_path)
+
+@pytest.fixture
+def shared(tmp_path):
+    """SharedVideoDownloads with download_video writing into tmp_path."""
+    from src.services.video_service import SharedVideoDownloads
+    calls = []
+
+    def fake_download(url):
+        calls.append(url)
+        path = tmp_path / f"video{len(calls)}.mp4"
+        path.write_bytes(b"test content")
+        return str(path), None
+
+    with patch('src.services.video_service.download_video', side_effect=fake_download):
+        yield SharedVideoDownloads(), calls
+
+def test_shared_download_reused_while_held(shared):
+    """Test a second consumer reuses the file while the first holds it."""
+    downloads, calls = shared
+    url = "https://example.com/video.mp4"
+
+    with downloads.video(url) as (first_path, _):
+        with downloads.video(url) as (second_path, _):
+            assert second_path == first_path
+        assert os.path.exists(first_path)
+
+    assert calls == [url]
+    assert not os.path.exists(first_path)
+
+def test_shared_download_concurrent_consumers(shared):
+    """Test concurrent consumers trigger a single download."""
+    import threading
+    downloads, calls = shared
+    url = "https://example.com/video.mp4"
+    barrier = threading.Barrier(4)
+    paths = []
+
+    def consume():
+        with downloads.scope():
+            barrier.wait()
+            with downloads.video(url) as (path, error):
+                paths.append(path)
+
+    with downloads.scope():
+        threads = [threading.Thread(target=consume) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert calls == [url]
+    assert len(set(paths)) == 1
+    assert not os.path.exists(paths[0])
+
+def test_shared_download_scope_defers_cleanup(shared):
+    """Test sequential consumers inside a scope share one download."""
+    downloads, calls = shared
+    url = "https://example.com/video.mp4"
+
+    with downloads.scope():
+        with downloads.video(url) as (first_path, _):
+            pass
+        assert os.path.exists(first_path)
+        with downloads.video(url) as (second_path, _):
+            assert second_path == first_path
+
+    assert calls == [url]
+    assert not os.path.exists(first_path)
+
+def test_shared_download_error_not_cached():
+    """Test a failed download is retried by the next consumer."""
+    from src.services.video_service import SharedVideoDownloads
+    downloads = SharedVideoDownloads()
+    with patch('src.services.video_service.download_video', return_value=(None, "Download error")) as mock_download:
+        with downloads.video("https://example.com/video.mp4") as (path, error):
+            assert path is None
+            assert error == "Download error"
+        with downloads.video("https://example.com/video.mp4") as (path, error):
+            assert error == "Download error"
+
+    assert mock_download.call_count == 2
@@ -0,0 +1,13 @@
+from src.utils.batching import split_batches
+
+def test_split_batches_by_size():
+    """Test items are grouped in order without exceeding the budget."""
+    batches = split_batches([("a", "xx"), ("b", "xx"), ("c", "xx")], 4)
+
+    assert batches == [{"a": "xx", "b": "xx"}, {"c": "xx"}]
+
+def test_split_batches_oversized_item():
+    """Test an item over the budget gets its own batch."""
+    batches = split_batches([("a", "x"), ("b", "x" * 10), ("c", "x")], 4)
+
+    assert batches == [{"a": "x"}, {"b": "x" * 10}, {"c": "x"}]
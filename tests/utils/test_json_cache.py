@@ -0,0 +1,108 @@
+import os
+import time
+import pytest
+from src.utils.json_cache import JsonDirectoryCache, JsonFileCache
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache" / "entries.json")
+
+def test_set_and_get(cache_path):
+    """Test values round-trip through the cache."""
+    cache = JsonFileCache(cache_path)
+    cache.set("key", {"uri": "files/abc"})
+
+    assert cache.get("key") == {"uri": "files/abc"}
+    assert cache.get("missing") is None
+
+def test_persisted_between_instances(cache_path):
+    """Test entries written by one instance are visible to another."""
+    JsonFileCache(cache_path).set("key", "value")
+
+    assert JsonFileCache(cache_path).get("key") == "value"
+
+def test_expired_entries(cache_path):
+    """Test expired entries are treated as misses."""
+    cache = JsonFileCache(cache_path)
+    cache.set("past", "value", expires_at=time.time() - 1)
+    cache.set("future", "value", expires_at=time.time() + 60)
+
+    assert cache.get("past") is None
+    assert cache.get("future") == "value"
+
+def test_default_ttl(cache_path):
+    """Test the default ttl applies when no expiry is given."""
+    cache = JsonFileCache(cache_path, ttl=-1)
+    cache.set("key", "value")
+
+    assert cache.get("key") is None
+
+def test_max_entries_evicts_least_recently_used(cache_path):
+    """Test the least recently used entry is evicted past the size limit."""
+    cache = JsonFileCache(cache_path, max_entries=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_delete(cache_path):
+    """Test deleted keys are gone."""
+    cache = JsonFileCache(cache_path)
+    cache.set("key", "value")
+    cache.delete("key")
+
+    assert cache.get("key") is None
+
+def test_unreadable_file(cache_path, tmp_path):
+    """Test a corrupt cache file is ignored."""
+    (tmp_path / "cache").mkdir()
+    with open(cache_path, "w") as f:
+        f.write("not json")
+
+    assert JsonFileCache(cache_path).get("key") is None
+
+def test_directory_cache_one_file_per_entry(tmp_path):
+    """Test each entry is stored in its own file and visible to other instances."""
+    directory = str(tmp_path / "entries")
+    cache = JsonDirectoryCache(directory)
+    cache.set("a", "long transcript")
+    cache.set("b", {"text": "other"})
+
+    assert len(os.listdir(directory)) == 2
+    assert JsonDirectoryCache(directory).get("a") == "long transcript"
+    assert cache.get("b") == {"text": "other"}
+    assert cache.get("missing") is None
+
+def test_directory_cache_expiry_and_delete(tmp_path):
+    """Test expired and deleted entries are misses and their files removed."""
+    directory = str(tmp_path / "entries")
+    cache = JsonDirectoryCache(directory, ttl=60)
+    cache.set("past", "value", expires_at=time.time() - 1)
+    cache.set("key", "value")
+
+    assert cache.get("past") is None
+    assert cache.get("key") == "value"
+    cache.delete("key")
+    assert cache.get("key") is None
+    assert os.listdir(directory) == []
+
+def test_directory_cache_evicts_least_recently_used(tmp_path):
+    """Test the least recently read entry is evicted past the size limit."""
+    cache = JsonDirectoryCache(str(tmp_path / "entries"), max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    past = time.time() - 60
+    os.utime(cache._entry_path("b"), (past, past))
+    os.utime(cache._entry_path("a"), (past - 60, past - 60))
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
@@ -0,0 +1,64 @@
+from src.utils.response_parser import VIDEO_INFO_SCHEMA, extract_video_info, has_youtube_video_link, validate_structured
+
+VIDEO_INFO_JSON_FULL = '{"title": "Episode", "channel": "Show", "channelLink": "", "url": ""}'
+VIDEO_JSON = '{"title": "Sleep Science", "channel": "Health Podcast", "channelLink": "https://www.youtube.com/@healthpodcast", "url": "https://www.youtube.com/watch?v=abc123def"}'
+
+def test_strict_json():
+    """Test valid JSON is parsed directly."""
+    info, confident = extract_video_info(VIDEO_JSON)
+
+    assert confident
+    assert info["title"] == "Sleep Science"
+    assert info["url"] == "https://www.youtube.com/watch?v=abc123def"
+
+def test_wrapped_api_result():
+    """Test the str() of an API result dict is unwrapped."""
+    info, confident = extract_video_info(str({"raw_response": f"```json\n{VIDEO_JSON}\n```"}))
+
+    assert confident
+    assert info["channel"] == "Health Podcast"
+
+def test_fenced_block_with_aliases():
+    """Test fenced JSON with alternative key names."""
+    text = 'Here you go:\n```json\n{"video_title": "Episode 12", "channel_name": "Show", "youtube_url": "https://youtu.be/xyz789abc"}\n```'
+
+    info, confident = extract_video_info(text)
+
+    assert confident
+    assert info == {"title": "Episode 12", "channel": "Show", "channelLink": "", "url": "https://youtu.be/xyz789abc"}
+
+def test_links_filled_from_text():
+    """Test missing links are captured from the surrounding text."""
+    text = '{"title": "Episode 12", "channel": "Show", "url": ""} Watch at https://www.youtube.com/watch?v=abc123def on https://www.youtube.com/@show'
+
+    info, confident = extract_video_info(text)
+
+    assert confident
+    assert info["url"] == "https://www.youtube.com/watch?v=abc123def"
+    assert info["channelLink"] == "https://www.youtube.com/@show"
+
+def test_low_confidence_without_video_url():
+    """Test responses without a video URL are not confident."""
+    info, confident = extract_video_info('{"title": "Episode 12", "channel": "Show", "url": ""}')
+
+    assert not confident
+    assert info["title"] == "Episode 12"
+
+def test_low_confidence_free_text():
+    """Test free text without structure is not confident."""
+    _, confident = extract_video_info("I could not find this podcast on YouTube.")
+
+    assert not confident
+
+def test_has_youtube_video_link():
+    """Test video links are told apart from channel links."""
+    assert has_youtube_video_link("see youtube.com/shorts/abcdef1")
+    assert not has_youtube_video_link("https://www.youtube.com/@show")
+    assert not has_youtube_video_link(None)
+
+def test_validate_structured():
+    """Test schema validation of structured model output."""
+    assert validate_structured(VIDEO_INFO_JSON_FULL, VIDEO_INFO_SCHEMA)["channel"] == "Show"
+    assert validate_structured('{"title": "Episode"}', VIDEO_INFO_SCHEMA) is None
+    assert validate_structured('{"title": 1, "channel": "", "channelLink": "", "url": ""}', VIDEO_INFO_SCHEMA) is None
+    assert validate_structured("not json", VIDEO_INFO_SCHEMA) is None
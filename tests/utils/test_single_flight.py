@@ -0,0 +1,90 @@
+import threading
+import pytest
+from src.utils.single_flight import SingleFlightCache, Uncached
+
+def test_get_many_loads_missing_keys_once():
+    """Test only missing keys are loaded and loaded values are reused."""
+    cache = SingleFlightCache()
+    calls = []
+
+    def load(keys):
+        calls.append(keys)
+        return {key: key.upper() for key in keys}
+
+    assert cache.get_many(["a", "b"], load, ttl=60) == {"a": "A", "b": "B"}
+    assert cache.get_many(["b", "c"], load, ttl=60) == {"b": "B", "c": "C"}
+    assert calls == [["a", "b"], ["c"]]
+
+def test_get_many_expired_and_disabled():
+    """Test values are not reused after their TTL, or at all with a TTL of 0."""
+    cache = SingleFlightCache()
+    calls = []
+
+    def load(keys):
+        calls.append(keys)
+        return {key: len(calls) for key in keys}
+
+    cache.get_many(["a"], load, ttl=0)
+    cache.get_many(["a"], load, ttl=-1)
+    assert cache.get_many(["a"], load, ttl=60) == {"a": 3}
+
+def test_get_many_coalesces_concurrent_loads():
+    """Test a caller asking for a key that is being loaded waits for that load."""
+    cache = SingleFlightCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_load(keys):
+        calls.append(keys)
+        started.set()
+        release.wait(5)
+        return {key: "value" for key in keys}
+
+    results = {}
+    owner = threading.Thread(target=lambda: results.update(owner=cache.get_many(["a"], slow_load, ttl=60)))
+    owner.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: results.update(waiter=cache.get_many(["a"], slow_load, ttl=60)))
+    waiter.start()
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert calls == [["a"]]
+    assert results == {"owner": {"a": "value"}, "waiter": {"a": "value"}}
+
+def test_get_many_does_not_cache_errors():
+    """Test a failed load is raised and retried on the next call."""
+    cache = SingleFlightCache()
+
+    def failing_load(keys):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_many(["a"], failing_load, ttl=60)
+    assert cache.get_many(["a"], lambda keys: {"a": 1}, ttl=60) == {"a": 1}
+
+def test_get_many_uncached_values():
+    """Test values wrapped in Uncached are returned but loaded again next time."""
+    cache = SingleFlightCache()
+    calls = []
+
+    def load(keys):
+        calls.append(keys)
+        return {key: Uncached(len(calls)) for key in keys}
+
+    assert cache.get_many(["a"], load, ttl=60) == {"a": 1}
+    assert cache.get_many(["a"], load, ttl=60) == {"a": 2}
+
+def test_max_entries_evicts_least_recently_used():
+    """Test the least recently used value is dropped when the cache is full."""
+    cache = SingleFlightCache(max_entries=2)
+    load = lambda keys: {key: key for key in keys}
+    cache.get_many(["a", "b"], load, ttl=60)
+    cache.get_many(["a"], load, ttl=60)
+    cache.get_many(["c"], load, ttl=60)
+
+    calls = []
+    cache.get_many(["a", "b", "c"], lambda keys: calls.append(keys) or {key: key for key in keys}, ttl=60)
+    assert calls == [["b"]]